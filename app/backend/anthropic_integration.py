@@ -3,15 +3,22 @@ Anthropic Claude API Integration for Interview Question Generator
 This module provides optimized integration with Claude for AI-powered interviews
 """
 
-import anthropic
+import httpx
 import json
 import re
 import os
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict
 from app.backend.schema import ResumeData, JobDescriptionData, InterviewSession
+from app.backend.service import llm_client, llm_telemetry
+from app.backend.service.llm_health import ANTHROPIC, health_monitor
 
 class AnthropicInterviewGenerator:
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-5-sonnet-20241022"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "claude-3-5-sonnet-20241022",
+        test_connection: bool = False,
+    ):
         """
         Initialize Anthropic Claude integration
         
@@ -19,6 +26,9 @@ class AnthropicInterviewGenerator:
         - claude-3-5-sonnet-20241022 (best quality, recommended)
         - claude-3-5-haiku-20241022 (fastest, good quality)
         - claude-3-opus-20240229 (highest quality, slower)
+
+        The connection test costs a live Claude call, so it only runs when
+        test_connection is set (e.g. from setup scripts), never at app startup.
         """
         self.model = model
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
@@ -26,23 +36,27 @@ class AnthropicInterviewGenerator:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
         
-        # Initialize Anthropic client
-        self.client = anthropic.Anthropic(api_key=self.api_key)
-        
-        # Test connection
-        self._test_connection()
+        if test_connection:
+            self._test_connection()
     
     def _test_connection(self):
         """Test the Claude API connection"""
         try:
-            # Simple test message
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=10,
-                messages=[{"role": "user", "content": "Reply with just 'OK'"}]
+            # Simple test message (runs once at startup, outside the event loop)
+            response = httpx.post(
+                llm_client.ANTHROPIC_API_URL,
+                headers=llm_client.anthropic_headers(self.api_key),
+                json={
+                    "model": self.model,
+                    "max_tokens": 10,
+                    "messages": [{"role": "user", "content": "Reply with just 'OK'"}]
+                },
+                timeout=llm_client.LLM_TIMEOUT,
             )
+            if response.status_code != 200:
+                raise llm_client.LLMError(f"Anthropic Claude API error: {response.text}")
             
-            if 'OK' in response.content[0].text:
+            if 'OK' in llm_client.anthropic_text(response.json()):
                 print("✅ Claude API connection successful!")
             else:
                 print("⚠️  Claude API connected but response was unexpected")
@@ -52,32 +66,89 @@ class AnthropicInterviewGenerator:
             print("Make sure your ANTHROPIC_API_KEY is valid and has sufficient credits")
             raise
     
-    def generate_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> List[str]:
-        """Generate initial interview questions using Claude"""
-        
-        # Create a focused prompt for better results
-        prompt = self._create_initial_questions_prompt(resume_data, jd_data)
+    async def generate_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> List[Dict]:
+        """Generate initial interview questions using Claude
+
+        One call returns each question together with its grading notes:
+        [{"question": str, "reference_notes": str, "skill_tags": [str]}, ...]
+        """
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=800,
-                temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
+            response = await llm_client.anthropic_messages(
+                self._initial_questions_payload(resume_data, jd_data),
+                api_key=self.api_key,
+                site="interview.initial_questions",
             )
-            
-            # Extract questions from response
-            questions = self._extract_questions_from_response(response.content[0].text)
-            
-            # Ensure we have at least 3 questions
-            if len(questions) < 3:
-                questions.extend(self._get_fallback_questions(jd_data))
-            
-            return questions[:4]  # Return max 4 questions
+            return self.parse_initial_questions(llm_client.anthropic_text(response), jd_data)
             
         except Exception as e:
             print(f"Error generating questions with Claude: {e}")
-            return self._get_fallback_questions(jd_data)
+            return self._question_items(self._get_fallback_questions(jd_data), jd_data)
+    
+    async def stream_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> AsyncIterator[str]:
+        """Yield Claude's raw text as it is generated; pass the full text to parse_initial_questions"""
+        async for delta in llm_client.anthropic_stream(
+            self._initial_questions_payload(resume_data, jd_data),
+            api_key=self.api_key,
+            site="interview.initial_questions",
+        ):
+            yield delta
+    
+    def parse_initial_questions(self, response_text: str, jd_data: JobDescriptionData) -> List[Dict]:
+        """Question items from Claude's JSON response, topped up with fallbacks"""
+        items = []
+        try:
+            match = re.search(r"\{.*\}", response_text, re.DOTALL)
+            # strict=False: notes often contain raw newlines inside strings
+            parsed = json.loads(match.group(0), strict=False) if match else {}
+        except ValueError:
+            parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        for entry in parsed.get("questions") or []:
+            if not isinstance(entry, dict):
+                continue
+            question = str(entry.get("question") or "").strip()
+            if not question:
+                continue
+            if not question.endswith('?'):
+                question += '?'
+            tags = entry.get("skill_tags")
+            items.append({
+                "question": question,
+                "reference_notes": str(entry.get("reference_notes") or "").strip(),
+                "skill_tags": [str(tag).strip() for tag in tags if str(tag).strip()] if isinstance(tags, list) else [],
+            })
+        
+        # Not JSON after all: take whatever questions the text contains. Broken
+        # JSON is skipped, its lines are fragments rather than questions
+        if not items and not self._looks_like_json(response_text):
+            items = self._question_items(self._extract_questions_from_response(response_text), jd_data)
+        
+        # Ensure we have at least 3 questions
+        if len(items) < 3:
+            items.extend(self._question_items(self._get_fallback_questions(jd_data), jd_data))
+        
+        return items[:4]  # Return max 4 questions
+    
+    @staticmethod
+    def _looks_like_json(response_text: str) -> bool:
+        return '"questions"' in response_text or response_text.lstrip("` \n").startswith(("{", "json"))
+    
+    def _question_items(self, questions: List[str], jd_data: JobDescriptionData) -> List[Dict]:
+        """Question items without grading notes (fallbacks, unstructured replies)"""
+        tags = jd_data.skills.must_have[:1]
+        return [{"question": q, "reference_notes": "", "skill_tags": list(tags)} for q in questions]
+    
+    def _initial_questions_payload(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> Dict:
+        # Create a focused prompt for better results
+        prompt = self._create_initial_questions_prompt(resume_data, jd_data)
+        return {
+            "model": self.model,
+            "max_tokens": 1200,
+            "temperature": 0.7,
+            "messages": [{"role": "user", "content": prompt}]
+        }
     
     def _create_initial_questions_prompt(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> str:
         """Create optimized prompt for initial questions"""
@@ -111,29 +182,62 @@ Generate 3 questions that:
 2. Assess learning ability for new required skills
 3. Test problem-solving and experience level
 
-Format each question on a new line starting with "Q:" 
-Example:
-Q: Tell me about your experience with [matching skill] and how you've applied it in projects.
-Q: This role requires [new skill]. How would you approach learning this technology?
-Q: Describe a challenging technical problem you solved and your approach.
+For each question also write grading reference notes for the interviewer
+who scores the answer later: 2-4 short points a strong answer at this
+experience level covers, and common mistakes. Tag each question with the
+required skills it assesses.
 
-Generate the questions now:"""
+Respond with JSON only, in this shape:
+{{"questions": [
+  {{"question": "Tell me about your experience with [matching skill] and how you've applied it in projects?",
+    "reference_notes": "- concrete project with measurable outcome\\n- ...",
+    "skill_tags": ["[matching skill]"]}}
+]}}"""
 
         return prompt
     
-    def generate_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str) -> Optional[str]:
+    async def generate_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str) -> Optional[str]:
         """Generate follow-up question based on candidate's answer"""
         
-        # Get recent conversation context
-        context = self._build_conversation_context(session)
+        try:
+            response = await llm_client.anthropic_messages(
+                self._followup_payload(session, current_question, candidate_answer),
+                api_key=self.api_key,
+                site="interview.followup",
+            )
+            return self.parse_followup_response(llm_client.anthropic_text(response))
+            
+        except Exception as e:
+            print(f"Error generating follow-up with Claude: {e}")
+            return None
+    
+    async def stream_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str) -> AsyncIterator[str]:
+        """Yield Claude's raw text as it is generated; pass the full text to parse_followup_response"""
+        async for delta in llm_client.anthropic_stream(
+            self._followup_payload(session, current_question, candidate_answer),
+            api_key=self.api_key,
+            site="interview.followup",
+        ):
+            yield delta
+    
+    def parse_followup_response(self, response_text: str) -> Optional[str]:
+        """Cleaned follow-up question, or None when Claude ends the interview"""
+        followup = response_text.strip()
+        
+        # Clean up the response
+        if "END_INTERVIEW" in followup.upper():
+            return None
+        
+        # Extract just the question part
+        followup = self._clean_followup_response(followup)
         
+        return followup if followup else None
+    
+    def _followup_payload(self, session: InterviewSession, current_question: str, candidate_answer: str) -> Dict:
         prompt = f"""You are conducting a technical interview. Based on the candidate's answer, decide if you need a follow-up question.
 
 JOB REQUIREMENTS: {', '.join(session.jd_data.skills.must_have[:3])}
 
-CONVERSATION SO FAR:
-{context}
-
 CURRENT QUESTION: {current_question}
 
 CANDIDATE'S ANSWER: {candidate_answer}
@@ -149,28 +253,64 @@ Decision: Generate ONE follow-up question OR write "END_INTERVIEW"
 
 Follow-up question:"""
 
+        return {
+            "model": self.model,
+            "max_tokens": 300,
+            "temperature": 0.8,
+            "system": self._interview_system(session),
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    
+    async def generate_followup_candidates(self, session: InterviewSession, current_question: str) -> Optional[Dict]:
+        """Follow-ups for the current question prepared before the answer arrives
+
+        Returns {"end_interview": bool, "clarify": ..., "deeper": ..., "gap": ...}
+        (see service.question_prefetch), or None if Claude's reply is unusable.
+        """
+        prompt = f"""You are conducting a technical interview. The candidate is still answering the current question. Prepare follow-up questions in advance so one can be asked as soon as the answer arrives.
+
+JOB REQUIREMENTS: {', '.join(session.jd_data.skills.must_have[:3])}
+
+CURRENT QUESTION: {current_question}
+
+QUESTIONS ASKED SO FAR (including the current one): {len(session.question_responses) + 1}
+
+Write ONE follow-up question for each case:
+- "clarify": the answer is too brief or vague; ask for more details or examples
+- "deeper": the answer shows good knowledge; probe deeper into technical details
+- "gap": the answer reveals gaps; ask about related fundamentals
+Set "end_interview" to true if you've asked enough questions (5+).
+Keep questions relevant to the job requirements.
+
+Respond with JSON only:
+{{"end_interview": false, "clarify": "...", "deeper": "...", "gap": "..."}}"""
+
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=300,
-                temperature=0.8,
-                messages=[{"role": "user", "content": prompt}]
+            response = await llm_client.anthropic_messages(
+                {
+                    "model": self.model,
+                    "max_tokens": 500,
+                    "temperature": 0.8,
+                    "system": self._interview_system(session),
+                    "messages": [{"role": "user", "content": prompt}]
+                },
+                api_key=self.api_key,
+                site="interview.followup_prefetch",
             )
-            
-            followup = response.content[0].text.strip()
-            
-            # Clean up the response
-            if "END_INTERVIEW" in followup.upper():
-                return None
-            
-            # Extract just the question part
-            followup = self._clean_followup_response(followup)
-            
-            return followup if followup else None
-            
+            match = re.search(r"\{.*\}", llm_client.anthropic_text(response), re.DOTALL)
+            raw = json.loads(match.group(0), strict=False) if match else {}
         except Exception as e:
-            print(f"Error generating follow-up with Claude: {e}")
+            print(f"Error prefetching follow-ups with Claude: {e}")
+            return None
+        
+        candidates = {"end_interview": bool(raw.get("end_interview"))}
+        for kind in ("clarify", "deeper", "gap"):
+            question = self._clean_followup_response(str(raw.get(kind) or ""))
+            if question:
+                candidates[kind] = question
+        if not candidates["end_interview"] and len(candidates) == 1:
             return None
+        return candidates
     
     def _extract_questions_from_response(self, response: str) -> List[str]:
         """Extract questions from Claude response"""
@@ -249,21 +389,43 @@ Follow-up question:"""
         
         return None
     
-    def _build_conversation_context(self, session: InterviewSession) -> str:
-        """Build conversation context for follow-up questions"""
-        
-        if not session.question_responses:
-            return "This is the first question."
-        
-        # Get last 2-3 Q&A pairs for context
-        recent_qa = session.question_responses[-2:] if len(session.question_responses) >= 2 else session.question_responses
-        
-        context_parts = []
-        for i, qa in enumerate(recent_qa, 1):
-            context_parts.append(f"Q{i}: {qa.question}")
-            context_parts.append(f"A{i}: {qa.answer[:200]}...")  # Limit answer length for context
-        
-        return '\n'.join(context_parts)
+    def _interview_system(self, session: InterviewSession) -> List[Dict]:
+        """System blocks shared by a session's follow-up calls, marked for prompt caching
+
+        The job, resume and planned questions never change during an interview
+        and earlier turns are only appended (one block each), so every call's
+        system prompt extends the previous call's. The last block carries
+        cache_control; Claude finds the previous call's cached prefix at an
+        earlier block boundary and only writes the new turn. Prefixes under
+        the model's minimum (1024 tokens, 2048 on Haiku) are not cached, so
+        the first turns of an interview are usually billed in full.
+        """
+        jd_data = session.jd_data
+        setup = f"""You are conducting a technical interview for {jd_data.company}. The job, the candidate's resume and the interview so far are below; each request says what to write.
+
+JOB DESCRIPTION:
+{jd_data.model_dump_json(exclude_none=True)}
+
+CANDIDATE RESUME:
+{session.resume_data.model_dump_json(exclude_none=True)}"""
+
+        # question_notes covers exactly the initial questions
+        planned = []
+        for i, (question, notes) in enumerate(zip(session.questions, session.question_notes), 1):
+            planned.append(f"{i}. {question}")
+            if notes.get("reference_notes"):
+                planned.append(f"Reference notes:\n{notes['reference_notes']}")
+        if planned:
+            setup += "\n\nPLANNED QUESTIONS:\n" + "\n".join(planned)
+
+        blocks = [setup, "INTERVIEW SO FAR:" if session.current_question_index else "This is the first question."]
+        # Answered turns before the current question; the request carries the current one
+        for i, qa in enumerate(session.question_responses[:session.current_question_index], 1):
+            blocks.append(f"Q{i}: {qa.question}\nA{i}: {qa.answer}")
+
+        system = [{"type": "text", "text": text} for text in blocks]
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+        return system
     
     def _get_fallback_questions(self, jd_data: JobDescriptionData) -> List[str]:
         """Fallback questions when Claude fails"""
@@ -301,55 +463,42 @@ Follow-up question:"""
             }
 
 # Utility functions for easy setup
-def check_anthropic_status(api_key: Optional[str] = None) -> Dict:
-    """Check if Claude API is accessible"""
-    try:
-        api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            return {
-                "status": "no_api_key",
-                "message": "ANTHROPIC_API_KEY environment variable is not set"
-            }
-        
-        client = anthropic.Anthropic(api_key=api_key)
-        # Test with a minimal request
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=5,
-            messages=[{"role": "user", "content": "Hi"}]
-        )
-        
-        return {
-            "status": "connected",
-            "message": "Claude API is accessible and working",
-            "model_tested": "claude-3-5-haiku-20241022"
-        }
-    except Exception as e:
+async def check_anthropic_status(api_key: Optional[str] = None) -> Dict:
+    """Cached Claude API status (see service.llm_health; never sends a billed request)"""
+    api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
         return {
-            "status": "error",
-            "error": str(e),
-            "message": "Failed to connect to Claude API"
+            "status": "no_api_key",
+            "message": "ANTHROPIC_API_KEY environment variable is not set"
         }
+    return health_monitor.status(ANTHROPIC)
 
 def get_recommended_models() -> List[Dict]:
-    """Get list of recommended Claude models for interviews"""
-    return [
+    """Get list of recommended Claude models for interviews
+
+    Prices come from the table llm_telemetry estimates spend with.
+    """
+    models = [
         {
             "name": "claude-3-5-sonnet-20241022",
             "description": "Best quality for interviews, excellent reasoning",
             "recommended": True,
-            "cost_per_1k_tokens": "$0.003"
         },
         {
             "name": "claude-3-5-haiku-20241022",
             "description": "Fastest and most cost-effective, good quality",
             "recommended": True,
-            "cost_per_1k_tokens": "$0.00025"
         },
         {
             "name": "claude-3-opus-20240229",
             "description": "Highest quality, best for complex reasoning",
             "recommended": False,
-            "cost_per_1k_tokens": "$0.015"
         }
-    ]
\ No newline at end of file
+    ]
+    for model in models:
+        price = llm_telemetry.price_for(model["name"])
+        if price:
+            # Input price; kept for existing clients of this field
+            model["cost_per_1k_tokens"] = f"${price['input'] / 1000:g}"
+            model["price_per_million_tokens"] = price
+    return models
\ No newline at end of file
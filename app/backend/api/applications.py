@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.backend import database, models, security
+from app.backend.service import resume_ingest
+from app.backend.service.storage import get_storage
+
+application_router = APIRouter()
+
+
+async def _get_application(db: AsyncSession, application_id: int) -> models.JobApplication:
+    # Job loaded eagerly: lazy loads are not available on an AsyncSession
+    application = await db.get(
+        models.JobApplication, application_id, options=[selectinload(models.JobApplication.job)]
+    )
+    if not application:
+        raise HTTPException(status_code=404, detail="Job application not found")
+    return application
+
+
+@application_router.get("/applications/{application_id}/parsed-resume")
+async def get_parsed_resume(
+    application_id: int,
+    current_user: models.User = Depends(security.hr_required),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    application = await _get_application(db, application_id)
+    if not application.parsed_resume:
+        raise HTTPException(status_code=404, detail="Resume has not been parsed yet")
+    return application.parsed_resume
+
+
+@application_router.get("/applications/{application_id}/resume-url")
+async def get_resume_url(
+    application_id: int,
+    current_user: models.User = Depends(security.hr_required),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """Time-limited download link for the application's resume"""
+    application = await _get_application(db, application_id)
+    storage = get_storage()
+    if not await storage.exists(application.resume_path):
+        raise HTTPException(status_code=404, detail="Resume file not found")
+    return {"url": storage.presigned_url(application.resume_path)}
+
+
+@application_router.post("/applications/{application_id}/screen")
+async def screen_application(
+    application_id: int,
+    current_user: models.User = Depends(security.hr_required),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    # Imported lazily: the screener pulls in the prompt libraries
+    from app.backend.service.screener import screen_candidate_with_ai
+
+    application = await _get_application(db, application_id)
+
+    # Reuse the resume parsed at ingest time instead of re-reading the file
+    resume = await resume_ingest.get_or_parse_resume(application)
+    if "error" in resume:
+        raise HTTPException(
+            status_code=422, detail=f"Resume could not be parsed: {resume['error']}"
+        )
+
+    screening = await screen_candidate_with_ai(
+        resume_ingest.job_to_jd_dict(application.job), resume
+    )
+    if "error" in screening:
+        raise HTTPException(status_code=502, detail=screening["error"])
+    return screening
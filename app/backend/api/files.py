@@ -0,0 +1,60 @@
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.backend.service.storage import StorageError, get_storage, unsign_key
+
+file_router = APIRouter()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(range_header: str, size: int) -> tuple:
+    """(start, end) inclusive for a single-range "bytes=a-b" header"""
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        raise HTTPException(status_code=416, detail="Unsupported Range header")
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+@file_router.get("/files/{token}")
+async def download_file(token: str, range_header: Optional[str] = Header(None, alias="Range")):
+    """Serve a blob from a signed link (local storage backend), with Range support"""
+    try:
+        key = unsign_key(token)
+        storage = get_storage()
+        size = await storage.size(key)
+    except StorageError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{os.path.basename(key)}"',
+    }
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    if range_header:
+        start, end = _parse_range(range_header, size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            storage.stream(key, start, end), status_code=206, media_type=media_type, headers=headers
+        )
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(storage.stream(key), media_type=media_type, headers=headers)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.backend import database, models, schema
 
@@ -12,12 +12,12 @@ question_router = APIRouter()
     status_code=status.HTTP_201_CREATED,
 )
 async def create_question(
-    question: schema.QuestionCreate, db: Session = Depends(database.get_db)
+    question: schema.QuestionCreate, db: AsyncSession = Depends(database.get_async_db)
 ):
     db_question = models.Question(**question.model_dump())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    await db.commit()
+    await db.refresh(db_question)
     return schema.QuestionResponse(
         id=db_question.id,
         text=db_question.text,
@@ -27,10 +27,8 @@ async def create_question(
 
 
 @question_router.get("/questions/{question_id}", response_model=schema.QuestionResponse)
-async def read_question(question_id: int, db: Session = Depends(database.get_db)):
-    question = (
-        db.query(models.Question).filter(models.Question.id == question_id).first()
-    )
+async def read_question(question_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    question = await db.get(models.Question, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     return schema.QuestionResponse(
@@ -45,20 +43,17 @@ async def read_question(question_id: int, db: Session = Depends(database.get_db)
 async def update_question(
     question_id: int,
     question: schema.QuestionCreate,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    db_question = (
-        db.query(models.Question).filter(models.Question.id == question_id).first()
-    )
+    db_question = await db.get(models.Question, question_id)
     if not db_question:
         raise HTTPException(status_code=404, detail="Question not found")
 
     # Update the question fields
     db_question.text = question.text
     db_question.tags = question.tags
-    db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    await db.commit()
+    await db.refresh(db_question)
 
     return schema.QuestionResponse(
         id=db_question.id,
@@ -69,14 +64,12 @@ async def update_question(
 
 
 @question_router.delete("/questions/{question_id}")
-async def delete_question(question_id: int, db: Session = Depends(database.get_db)):
-    db_question = (
-        db.query(models.Question).filter(models.Question.id == question_id).first()
-    )
+async def delete_question(question_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    db_question = await db.get(models.Question, question_id)
     if not db_question:
         raise HTTPException(status_code=404, detail="Question not found")
 
-    db.delete(db_question)
-    db.commit()
+    await db.delete(db_question)
+    await db.commit()
 
     return {"message": "Question deleted successfully"}
@@ -1,5 +1,10 @@
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.backend import database, models, schema
 from app.backend.service.question_analysis import QuestionAnalysisService
@@ -12,18 +17,15 @@ async def batch_score_questions(
     candidate_id: int,
     job_id: int,
     application_id: int,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    db_application = (
-        db.query(models.JobApplication)
-        .filter(models.JobApplication.id == application_id)
-        .first()
-    )
+    started = time.perf_counter()
+    db_application = await db.get(models.JobApplication, application_id)
 
     if not db_application:
         raise HTTPException(status_code=404, detail="Job application not found")
 
-    db_job = db.query(models.Job).filter(models.Job.job_id == job_id).first()
+    db_job = await db.get(models.Job, job_id)
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -32,49 +34,42 @@ async def batch_score_questions(
 
     # Extract primary skill from job required_skills
     primary_skill = (
-        db_job.required_skills.split(",")[0] if db_job.required_skills else "General"
+        db_job.must_have_skills.split(",")[0] if db_job.must_have_skills else "General"
     )
 
-    # Fetch all questions and answers for candidate and job
-    db_question_answers = (
-        db.query(models.QuestionAnswer)
-        .filter(models.QuestionAnswer.candidate_id == candidate_id)
-        .all()
-    )
-    if not db_question_answers:
+    # Fetch all question-answer pairs for the candidate with their question text
+    qa_rows = (
+        await db.execute(
+            select(
+                models.QuestionAnswer.question_id,
+                models.Question.text,
+                models.QuestionAnswer.answer,
+            )
+            .join(models.Question, models.Question.id == models.QuestionAnswer.question_id)
+            .where(models.QuestionAnswer.candidate_id == candidate_id)
+            .order_by(models.QuestionAnswer.id)
+        )
+    ).all()
+    if not qa_rows:
         raise HTTPException(
             status_code=404, detail="No question answers found for candidate"
         )
 
-    # Prepare question-answer pairs for analysis
-    qa_pairs = []
-    for qa in db_question_answers:
-        # Get the question text
-        question = (
-            db.query(models.Question)
-            .filter(models.Question.id == qa.question_id)
-            .first()
-        )
-        if question:
-            qa_pairs.append(
-                {
-                    "question_id": qa.question_id,
-                    "question": question.text,
-                    "answer": qa.answer,
-                }
-            )
-
-    if not qa_pairs:
-        raise HTTPException(
-            status_code=404, detail="No valid question-answer pairs found"
-        )
+    qa_pairs = [
+        {"question_id": question_id, "question": text, "answer": answer}
+        for question_id, text, answer in qa_rows
+    ]
+    # End the read transaction so no pooled connection is held during LLM calls
+    await db.commit()
+    db_seconds = time.perf_counter() - started
 
     # Initialize the question analysis service
     analysis_service = QuestionAnalysisService()
 
+    llm_started = time.perf_counter()
     try:
         # Analyze the question-answer pairs
-        analysis_results = analysis_service.analyze_questions(
+        analysis_results = await analysis_service.analyze_questions(
             qa_pairs,
             role="Software Engineer",  # This could be made dynamic based on job details
             yoe=5,
@@ -84,46 +79,111 @@ async def batch_score_questions(
         raise HTTPException(
             status_code=500, detail=f"Question analysis failed: {str(e)}"
         )
+    llm_seconds = time.perf_counter() - llm_started
 
-    # Store the results in the database
-    results = []
+    # Build all score rows, then write them in one statement and one transaction
+    score_rows = []
+    # One entry per analysis result, in input order: a failure dict, or the
+    # question_id whose stored row is reported once the upsert returns
+    outcomes = []
     for result in analysis_results:
         question_id = result["question_id"]
+        if "error" in result:
+            outcomes.append(
+                {
+                    "question_id": question_id,
+                    "score": None,
+                    "verdict": None,
+                    "message": f"Question scoring failed: {result['error']}",
+                }
+            )
+            continue
+
+        outcomes.append(question_id)
         scores = result.get("scores", {})
-        print(result)
-        # Create or update the question score
-        db_score = models.QuestionScore(
-            application_id=application_id,
-            candidate_id=candidate_id,
-            question_id=question_id,
-            technical_correctness=scores.get("technical_correctness", 0),
-            specificity_depth=scores.get("specificity_depth", 0),
-            reasoning_quality=scores.get("reasoning_quality", 0),
-            real_world_signals=scores.get("real_world_signals", 0),
-            communication=scores.get("communication", 0),
-            final_score=result.get("final_score_10", 0),
-            verdict=result.get("verdict", "fail"),
-            improvement_tips=(
-                ", ".join(result.get("improvement_tips", []))
-                if isinstance(result.get("improvement_tips"), list)
-                else result.get("improvement_tips", "")
-            ),
+        score_rows.append(
+            {
+                "application_id": application_id,
+                "candidate_id": candidate_id,
+                "question_id": question_id,
+                "technical_correctness": _as_int(scores.get("technical_correctness")),
+                "specificity_depth": _as_int(scores.get("specificity_depth")),
+                "reasoning_quality": _as_int(scores.get("reasoning_quality")),
+                "real_world_signals": _as_int(scores.get("real_world_signals")),
+                "communication": _as_int(scores.get("communication")),
+                "final_score": _as_int(result.get("final_score_10")),
+                "verdict": result.get("verdict", "fail"),
+                "improvement_tips": (
+                    ", ".join(result.get("improvement_tips", []))
+                    if isinstance(result.get("improvement_tips"), list)
+                    else result.get("improvement_tips", "")
+                ),
+            }
         )
 
-        db.add(db_score)
-        db.commit()
-        db.refresh(db_score)
+    # A repeated question_id would hit the same row twice within one upsert
+    score_rows = list({row["question_id"]: row for row in score_rows}.values())
+
+    write_started = time.perf_counter()
+    stored = {}
+    if score_rows:
+        # Upsert keyed by (application_id, question_id) so re-scoring is idempotent
+        stored = {
+            row.question_id: row
+            for row in await db.execute(_upsert_scores_statement(db, score_rows))
+        }
+        await db.commit()
+    db_seconds += time.perf_counter() - write_started
 
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, dict):
+            results.append(outcome)
+            continue
+        row = stored.get(outcome)
+        if row is None:
+            continue
         results.append(
             {
-                "question_id": db_score.question_id,
-                "score": db_score.final_score,
-                "verdict": db_score.verdict,
+                "question_id": row.question_id,
+                "score": row.final_score,
+                "verdict": row.verdict,
                 "message": "Question score created successfully",
             }
         )
 
-    return {"results": results}
+    return {
+        "results": results,
+        "db_ms": round(db_seconds * 1000, 2),
+        "llm_ms": round(llm_seconds * 1000, 2),
+    }
+
+
+def _as_int(value) -> int:
+    """Scores come back from the LLM as JSON numbers; the columns are integers"""
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _upsert_scores_statement(db: AsyncSession, score_rows: list):
+    """INSERT ... ON CONFLICT (application_id, question_id) DO UPDATE ... RETURNING"""
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    statement = insert(models.QuestionScore).values(score_rows)
+    updatable = [
+        column
+        for column in score_rows[0]
+        if column not in ("application_id", "question_id")
+    ]
+    return statement.on_conflict_do_update(
+        index_elements=["application_id", "question_id"],
+        set_={column: statement.excluded[column] for column in updatable},
+    ).returning(
+        models.QuestionScore.question_id,
+        models.QuestionScore.final_score,
+        models.QuestionScore.verdict,
+    )
 
 
 @score_router.post(
@@ -132,18 +192,16 @@ async def batch_score_questions(
 async def create_question_score(
     question_id: int,
     score: schema.QuestionScoreCreate,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    db_question = (
-        db.query(models.Question).filter(models.Question.id == question_id).first()
-    )
+    db_question = await db.get(models.Question, question_id)
     if not db_question:
         raise HTTPException(status_code=404, detail="Question not found")
 
     db_score = models.QuestionScore(**score.model_dump(), question_id=question_id)
     db.add(db_score)
-    db.commit()
-    db.refresh(db_score)
+    await db.commit()
+    await db.refresh(db_score)
 
     return schema.QuestionScoreResponse(
         id=db_score.id,
@@ -156,11 +214,11 @@ async def create_question_score(
 @score_router.get(
     "/questions/{question_id}/score", response_model=schema.QuestionScoreResponse
 )
-async def read_question_score(question_id: int, db: Session = Depends(database.get_db)):
-    db_score = (
-        db.query(models.QuestionScore)
-        .filter(models.QuestionScore.question_id == question_id)
-        .first()
+async def read_question_score(question_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    db_score = await db.scalar(
+        select(models.QuestionScore)
+        .where(models.QuestionScore.question_id == question_id)
+        .limit(1)
     )
     if not db_score:
         raise HTTPException(status_code=404, detail="Question score not found")
@@ -178,21 +236,21 @@ async def read_question_score(question_id: int, db: Session = Depends(database.g
 async def update_question_score(
     question_id: int,
     score: schema.QuestionScoreCreate,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
 
-    db_score = (
-        db.query(models.QuestionScore)
-        .filter(models.QuestionScore.question_id == question_id)
-        .first()
+    db_score = await db.scalar(
+        select(models.QuestionScore)
+        .where(models.QuestionScore.question_id == question_id)
+        .limit(1)
     )
     if not db_score:
         raise HTTPException(status_code=404, detail="Question score not found")
 
     db_score.score = score.score
     db.add(db_score)
-    db.commit()
-    db.refresh(db_score)
+    await db.commit()
+    await db.refresh(db_score)
 
     return schema.QuestionScoreResponse(
         id=db_score.id,
@@ -204,17 +262,17 @@ async def update_question_score(
 
 @score_router.delete("/questions/{question_id}/score")
 async def delete_question_score(
-    question_id: int, db: Session = Depends(database.get_db)
+    question_id: int, db: AsyncSession = Depends(database.get_async_db)
 ):
-    db_score = (
-        db.query(models.QuestionScore)
-        .filter(models.QuestionScore.question_id == question_id)
-        .first()
+    db_score = await db.scalar(
+        select(models.QuestionScore)
+        .where(models.QuestionScore.question_id == question_id)
+        .limit(1)
     )
     if not db_score:
         raise HTTPException(status_code=404, detail="Question score not found")
 
-    db.delete(db_score)
-    db.commit()
+    await db.delete(db_score)
+    await db.commit()
 
     return {"message": "Question score deleted successfully"}
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.backend import database, models, schema, security
+from app.backend.service import task_queue
+
+task_router = APIRouter()
+
+
+def _task_response(task: models.BackgroundTask) -> schema.TaskResponse:
+    return schema.TaskResponse(
+        id=task.id,
+        kind=task.kind,
+        status=task.status,
+        attempts=task.attempts,
+        max_attempts=task.max_attempts,
+        payload=task.payload,
+        result=task.result,
+        last_error=task.last_error,
+        run_after=task.run_after,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+    )
+
+
+@task_router.get("/tasks/{task_id}", response_model=schema.TaskResponse)
+def get_task(
+    task_id: int,
+    current_user: models.User = Depends(security.hr_required),
+    db: Session = Depends(database.get_db),
+):
+    task = task_queue.get_task(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return _task_response(task)
+
+
+@task_router.get("/tasks", response_model=list[schema.TaskResponse])
+def list_tasks(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = 50,
+    current_user: models.User = Depends(security.hr_required),
+    db: Session = Depends(database.get_db),
+):
+    query = db.query(models.BackgroundTask)
+    if status:
+        query = query.filter(models.BackgroundTask.status == status)
+    if kind:
+        query = query.filter(models.BackgroundTask.kind == kind)
+    tasks = query.order_by(models.BackgroundTask.id.desc()).limit(min(limit, 500)).all()
+    return [_task_response(task) for task in tasks]
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.backend import database, models, schema
 from app.backend.service.question_analysis import QuestionAnalysisService
@@ -7,8 +11,8 @@ from app.backend.service.question_analysis import QuestionAnalysisService
 user_router = APIRouter()
 
 @user_router.get("/users", response_model=list[schema.UserResponse])
-async def get_users(db: Session = Depends(database.get_db)):
-    users = db.query(models.User).all()
+async def get_users(db: AsyncSession = Depends(database.get_async_db)):
+    users = (await db.scalars(select(models.User))).all()
     return [schema.UserResponse(id=user.id, email=user.email, name=user.name, role=user.role, message="User retrieved successfully") for user in users]
 
 # @user_router.get("/applicants", response_model=list[schema.UserResponse])
@@ -30,63 +34,116 @@ async def get_users(db: Session = Depends(database.get_db)):
 
 
 @user_router.get("/applicants")
-async def get_unique_users_with_job_details(db: Session = Depends(database.get_db)):
-    # Get unique users based on name and email
-    unique_users = db.query(models.User).all()
-    
-    result = []
-    for user in unique_users:
-        # Find all job applications for users with matching email
-        applications = (
-            db.query(models.JobApplication)
-            .filter(models.JobApplication.email == user.email)
-            .all()
+async def get_unique_users_with_job_details(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="user_id to continue after (X-Next-Cursor)"),
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    # Applications joined to their job; filters narrow which applications count
+    applications = (
+        select(
+            models.JobApplication.id.label("application_id"),
+            models.JobApplication.email.label("email"),
+            models.JobApplication.job_id.label("job_id"),
         )
-        
-        job_details = []
-        for application in applications:
-            # Get the job details for each application
-            job = db.query(models.Job).filter(models.Job.job_id == application.job_id).first()
-            
-            if job:
-                # Count number of applications for this job
-                application_count = (
-                    db.query(func.count(models.JobApplication.id))
-                    .filter(models.JobApplication.job_id == job.job_id)
-                    .scalar()
-                )
-                
-                # Get the recruiter name
-                recruiter = db.query(models.User).filter(models.User.id == job.recruiter_id).first()
-                recruiter_name = recruiter.name if recruiter else "Unknown"
-                
-                # Create a dictionary with job details and application info
-                job_detail = {
-                    "application_id": application.id,
-                    "job_id": job.job_id,
-                    "job_title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "experience": job.experience,
-                    "job_overview": job.job_overview,
-                    "key_responsibilities": job.key_responsibilities,
-                    "must_have_skills": job.must_have_skills,
-                    "good_to_have_skills": job.good_to_have_skills,
-                    "job_type": job.job_type,
-                    "recruiter_name": recruiter_name,
-                    "total_applications": application_count,
-                    "posted_date": job.posted_date
-                }
-                job_details.append(job_detail)
-        
-        # Add user with job details to result
-        user_detail = dict(
-            user_id=user.id,
-            name=user.name,
-            email=user.email,
-            role=user.role,
-            job_applications=job_details
+        .join(models.Job, models.Job.job_id == models.JobApplication.job_id)
+    )
+    if job_id is not None:
+        applications = applications.where(models.JobApplication.job_id == job_id)
+    if recruiter_id is not None:
+        applications = applications.where(models.Job.recruiter_id == recruiter_id)
+    applications = applications.subquery()
+
+    # One page of users, keyset-paginated on user id (one extra row to detect more)
+    users_page = select(models.User.id).order_by(models.User.id).limit(limit + 1)
+    if cursor is not None:
+        users_page = users_page.where(models.User.id > cursor)
+    if job_id is not None or recruiter_id is not None:
+        users_page = users_page.where(
+            select(applications.c.application_id)
+            .where(applications.c.email == models.User.email)
+            .exists()
         )
-        result.append(user_detail)
-    
+    users_page = users_page.subquery()
+
+    # Correlated count: evaluated only for jobs on this page, via the job_id index
+    total_applications = (
+        select(func.count(models.JobApplication.id))
+        .where(models.JobApplication.job_id == models.Job.job_id)
+        .correlate(models.Job)
+        .scalar_subquery()
+    )
+    recruiter = aliased(models.User)
+
+    rows = (await db.execute(
+        select(
+            models.User.id,
+            models.User.name,
+            models.User.email,
+            models.User.role,
+            applications.c.application_id,
+            models.Job.job_id,
+            models.Job.title,
+            models.Job.company,
+            models.Job.location,
+            models.Job.experience,
+            models.Job.job_overview,
+            models.Job.key_responsibilities,
+            models.Job.must_have_skills,
+            models.Job.good_to_have_skills,
+            models.Job.job_type,
+            models.Job.posted_date,
+            recruiter.name.label("recruiter_name"),
+            total_applications.label("total_applications"),
+        )
+        .join(users_page, users_page.c.id == models.User.id)
+        .outerjoin(applications, applications.c.email == models.User.email)
+        .outerjoin(models.Job, models.Job.job_id == applications.c.job_id)
+        .outerjoin(recruiter, recruiter.id == models.Job.recruiter_id)
+        .order_by(models.User.id, applications.c.application_id)
+    )).all()
+
+    # Group the flat rows back into users with their job applications
+    result = []
+    users_by_id = {}
+    for row in rows:
+        user_detail = users_by_id.get(row.id)
+        if user_detail is None:
+            if len(users_by_id) == limit:
+                # The extra row only signals that another page exists
+                response.headers["X-Next-Cursor"] = str(result[-1]["user_id"])
+                break
+            user_detail = dict(
+                user_id=row.id,
+                name=row.name,
+                email=row.email,
+                role=row.role,
+                job_applications=[],
+            )
+            users_by_id[row.id] = user_detail
+            result.append(user_detail)
+
+        if row.application_id is not None:
+            user_detail["job_applications"].append(
+                {
+                    "application_id": row.application_id,
+                    "job_id": row.job_id,
+                    "job_title": row.title,
+                    "company": row.company,
+                    "location": row.location,
+                    "experience": row.experience,
+                    "job_overview": row.job_overview,
+                    "key_responsibilities": row.key_responsibilities,
+                    "must_have_skills": row.must_have_skills,
+                    "good_to_have_skills": row.good_to_have_skills,
+                    "job_type": row.job_type,
+                    "recruiter_name": row.recruiter_name or "Unknown",
+                    "total_applications": row.total_applications or 0,
+                    "posted_date": row.posted_date,
+                }
+            )
+
     return result
@@ -1,2 +1,7 @@
+import os
+
 UPLOAD_DIR = "uploads/resumes"
 ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx"}
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
@@ -1,21 +1,203 @@
 import os
+import time
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.backend import metrics
 
 # Load .env file
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Async endpoints use an asyncio driver; derived from DATABASE_URL unless set
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool settings. The sync engine (workers, sync endpoints) and the
+# async engine (async endpoints) each keep their own pool, so a process can hold
+# up to DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW
+# connections. Keep that, times the number of API processes (plus
+# DB_POOL_SIZE + DB_MAX_OVERFLOW per worker process), below max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections older than this (seconds), before server/proxy idle timeouts cut them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Pool metrics are labelled engine="sync" (Session) or engine="async" (AsyncSession)
+pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", ["engine"]
+)
+pool_in_use_at_checkout = metrics.histogram(
+    "db_pool_in_use_at_checkout",
+    "Connections already checked out when a new checkout happens",
+    ["engine"],
+    buckets=(0, 1, 2, 5, 10, 15, 20, 30, 50, 100),
+)
+pool_checkouts = metrics.counter("db_pool_checkouts_total", "Connection checkouts", ["engine"])
+pool_timeouts = metrics.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT (QueuePool limit reached)",
+    ["engine"],
+)
+pool_connects = metrics.counter(
+    "db_pool_connections_created_total", "New DB connections opened", ["engine"]
+)
+pool_invalidations = metrics.counter(
+    "db_pool_invalidations_total",
+    "Connections discarded as broken (incl. failed pre-pings)",
+    ["engine"],
+)
+
+
+class _InstrumentedPoolMixin:
+    """Records how long checkouts wait and how often they time out"""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc(engine=self.engine_label)
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started, engine=self.engine_label)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def _engine_options(
+    url: str,
+    poolclass=InstrumentedQueuePool,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:"):
+        # In-memory SQLite needs its single-connection pool
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+_async_engine = None
+_async_session_factory = None
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (asyncpg / aiosqlite)"""
+    if ASYNC_DATABASE_URL:
+        return ASYNC_DATABASE_URL
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+
+def get_async_engine():
+    """Async engine, created on first use so sync-only processes never import asyncpg"""
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url(DATABASE_URL)
+        _async_engine = create_async_engine(
+            url,
+            **_engine_options(
+                url, InstrumentedAsyncQueuePool, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW
+            ),
+        )
+        _instrument(_async_engine.sync_engine, "async")
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async pool's connections; called on API shutdown"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # expire_on_commit=False: attribute access after commit would otherwise
+        # need an implicit (blocking) refresh, which AsyncSession cannot do
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+def _pool_stat(pool, name: str) -> float:
+    value = getattr(pool, name, None)
+    return max(value(), 0) if callable(value) else 0
+
+
+def _pool_stats(name: str) -> dict:
+    stats = {("sync",): _pool_stat(engine.pool, name)}
+    if _async_engine is not None:
+        stats[("async",)] = _pool_stat(_async_engine.pool, name)
+    return stats
+
+
+metrics.gauge("db_pool_size", "Configured pool size", ["engine"], callback=lambda: _pool_stats("size"))
+metrics.gauge("db_pool_checked_out", "Connections currently in use", ["engine"], callback=lambda: _pool_stats("checkedout"))
+metrics.gauge("db_pool_checked_in", "Idle connections in the pool", ["engine"], callback=lambda: _pool_stats("checkedin"))
+metrics.gauge("db_pool_overflow", "Connections open beyond pool_size", ["engine"], callback=lambda: _pool_stats("overflow"))
+
+
+def _instrument(target_engine, label: str) -> None:
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_connects.inc(engine=label)
+
+    @event.listens_for(target_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts.inc(engine=label)
+        # This connection is already counted as checked out
+        pool_in_use_at_checkout.observe(
+            max(_pool_stat(target_engine.pool, "checkedout") - 1, 0), engine=label
+        )
+
+    @event.listens_for(target_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_invalidations.inc(engine=label)
+
+
+_instrument(engine, "sync")
+
+
 # Dependency for DB session
 def get_db():
     db = SessionLocal()
@@ -23,3 +205,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency for an async DB session (async def endpoints)
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,303 @@
+"""
+Bulk resume ingestion.
+
+Usage:
+    python -m app.backend.ingest RESUMES_DIR_OR_ARCHIVE [--processes 4] [--llm-concurrency 8]
+
+Walks a directory (recursively) or a .zip/.tar/.tar.gz archive of PDF, DOCX
+and TXT resumes and fills JobApplication.parsed_resume for the applications
+whose resume_path points at those files (matched by path, then by file name
+when exactly one application has that name):
+
+1. text is extracted in parallel across --processes worker processes,
+2. files are de-duplicated by content hash, so each distinct resume reaches
+   the LLM once (and the parse cache is consulted first),
+3. distinct resumes are parsed with at most --llm-concurrency calls in flight,
+4. parsed_resume is written in batches of --batch-size applications.
+
+Files are processed --chunk at a time so memory stays flat for tens of
+thousands of resumes. Files that match no application are reported and, with
+--output, their parses are written to a JSON-lines file.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from app.backend import config, database, models
+from app.backend.prompts.prompt import get_prompt
+from app.backend.service.parse_cache import content_hash, parse_cache
+
+RESUME_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+
+def iter_resume_files(root: str) -> Iterator[str]:
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in RESUME_EXTENSIONS:
+                yield os.path.join(directory, name)
+
+
+def unpack_archive(archive_path: str, target_dir: str) -> str:
+    """Extract resume files from an archive into target_dir, keeping their relative paths"""
+    os.makedirs(target_dir, exist_ok=True)
+
+    def target_for(member_name: str) -> Optional[str]:
+        # Keep the directory part so a/resume.pdf and b/resume.pdf stay apart,
+        # but skip members that would land outside target_dir
+        parts = member_name.replace("\\", "/").split("/")
+        if parts[0] == "" or ":" in parts[0] or ".." in parts:
+            print(f"⚠️ Skipping unsafe archive member: {member_name}")
+            return None
+        parts = [part for part in parts if part not in ("", ".")]
+        if not parts or os.path.splitext(parts[-1])[1].lower() not in RESUME_EXTENSIONS:
+            return None
+        target = os.path.join(target_dir, *parts)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        return target
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                target = None if member.is_dir() else target_for(member.filename)
+                if target:
+                    with archive.open(member) as src, open(target, "wb") as dst:
+                        dst.write(src.read())
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                target = target_for(member.name) if member.isfile() else None
+                if target:
+                    with archive.extractfile(member) as src, open(target, "wb") as dst:
+                        dst.write(src.read())
+    else:
+        raise ValueError(f"Not a directory or supported archive: {archive_path}")
+    return target_dir
+
+
+def _init_extract_worker() -> None:
+    from app.backend.service import parser
+
+    # Pool workers are daemonic and cannot start parser's own PDF process pool
+    parser.PDF_WORKERS = 1
+
+
+def _extract(path: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    """(path, content hash, text, error) for one file; runs in worker processes"""
+    from app.backend.service.parser import get_text_from_file
+
+    try:
+        text = get_text_from_file(path)
+    except Exception as e:
+        return path, None, None, str(e)
+    if not text.strip():
+        return path, None, None, "no text extracted"
+    return path, content_hash(text), text, None
+
+
+def _chunks(items: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _load_applications() -> Tuple[Dict[str, List[Tuple[int, Optional[str]]]], Dict[str, List[Tuple[int, Optional[str]]]]]:
+    """Applications indexed by resume path and by file name: [(id, stored content hash)]"""
+    by_path: Dict[str, list] = {}
+    by_name: Dict[str, list] = {}
+    with database.SessionLocal() as db:
+        rows = db.execute(
+            select(
+                models.JobApplication.id,
+                models.JobApplication.resume_path,
+                models.JobApplication.parsed_resume["content_hash"].as_string(),
+            )
+        )
+        for application_id, resume_path, stored_hash in rows:
+            entry = (application_id, stored_hash)
+            by_path.setdefault(os.path.abspath(resume_path), []).append(entry)
+            by_name.setdefault(os.path.basename(resume_path), []).append(entry)
+    return by_path, by_name
+
+
+def _write_batch(rows: List[Dict]) -> None:
+    with database.SessionLocal() as db:
+        # ORM bulk UPDATE by primary key: one executemany per batch
+        db.execute(update(models.JobApplication), rows)
+        db.commit()
+
+
+class IngestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counters = {
+            "files": 0,
+            "extract_failed": 0,
+            "duplicates": 0,
+            "unmatched": 0,
+            "up_to_date": 0,
+            "parsed": 0,
+            "parse_failed": 0,
+            "applications_updated": 0,
+        }
+        self.seconds = {"extract": 0.0, "parse": 0.0, "write": 0.0}
+
+    def report(self, final: bool = False) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.counters["files"] / elapsed if elapsed else 0.0
+        counts = ", ".join(f"{name}={value}" for name, value in self.counters.items())
+        timings = ", ".join(f"{name}={value:.1f}s" for name, value in self.seconds.items())
+        prefix = "✅ Done" if final else "⏳"
+        print(f"{prefix} {counts} | {rate:.1f} files/s over {elapsed:.1f}s ({timings})", flush=True)
+
+
+async def ingest(
+    source: str,
+    processes: int,
+    llm_concurrency: int,
+    batch_size: int,
+    chunk_size: int,
+    force: bool = False,
+    output: Optional[str] = None,
+    extract_dir: Optional[str] = None,
+) -> IngestStats:
+    from app.backend.service.parser import parse_with_ai
+
+    if not os.path.isdir(source):
+        target = extract_dir or os.path.join(
+            config.UPLOAD_DIR, "bulk", os.path.splitext(os.path.basename(source))[0]
+        )
+        source = await asyncio.to_thread(unpack_archive, source, target)
+
+    stats = IngestStats()
+    by_path, by_name = await asyncio.to_thread(_load_applications)
+    prompt = get_prompt("parse_resume")
+    semaphore = asyncio.Semaphore(max(1, llm_concurrency))
+    # content hash -> parsed resume (or error dict), shared across chunks
+    parsed: Dict[str, Dict] = {}
+    pending_rows: List[Dict] = []
+    output_file = open(output, "a", encoding="utf-8") if output else None
+
+    async def parse(text_hash: str, text: str) -> None:
+        async with semaphore:
+            resume = await parse_with_ai(text, prompt)
+        parsed[text_hash] = resume
+        if "error" in resume:
+            stats.counters["parse_failed"] += 1
+        else:
+            stats.counters["parsed"] += 1
+
+    async def flush(force_write: bool = False) -> None:
+        while pending_rows and (force_write or len(pending_rows) >= batch_size):
+            batch = pending_rows[:batch_size]
+            del pending_rows[:batch_size]
+            started = time.perf_counter()
+            await asyncio.to_thread(_write_batch, batch)
+            stats.seconds["write"] += time.perf_counter() - started
+            stats.counters["applications_updated"] += len(batch)
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        with context.Pool(processes=max(1, processes), initializer=_init_extract_worker) as pool:
+            for chunk in _chunks(iter_resume_files(source), chunk_size):
+                stats.counters["files"] += len(chunk)
+
+                started = time.perf_counter()
+                extracted = await asyncio.to_thread(pool.map, _extract, chunk, 4)
+                stats.seconds["extract"] += time.perf_counter() - started
+
+                # Decide which files need the LLM: one call per new content hash,
+                # none for files whose applications already store this hash
+                to_parse: Dict[str, str] = {}
+                targets = []
+                for path, text_hash, text, error in extracted:
+                    if error:
+                        stats.counters["extract_failed"] += 1
+                        print(f"❌ {path}: {error}")
+                        continue
+                    applications = by_path.get(os.path.abspath(path))
+                    if not applications:
+                        # A shared file name cannot tell its applications apart
+                        same_name = by_name.get(os.path.basename(path), [])
+                        applications = same_name if len(same_name) == 1 else []
+                    if not applications:
+                        stats.counters["unmatched"] += 1
+                        if not output_file:
+                            continue
+                    stale = [app_id for app_id, stored in applications if force or stored != text_hash]
+                    stats.counters["up_to_date"] += len(applications) - len(stale)
+                    if applications and not stale:
+                        continue
+                    if text_hash in parsed or text_hash in to_parse:
+                        stats.counters["duplicates"] += 1
+                    else:
+                        to_parse[text_hash] = text
+                    targets.append((path, text_hash, stale))
+
+                started = time.perf_counter()
+                await asyncio.gather(*(parse(h, t) for h, t in to_parse.items()))
+                stats.seconds["parse"] += time.perf_counter() - started
+
+                parsed_at = datetime.utcnow().isoformat()
+                for path, text_hash, application_ids in targets:
+                    resume = parsed[text_hash]
+                    if "error" in resume:
+                        print(f"❌ {path}: {resume['error']}")
+                        continue
+                    if output_file:
+                        output_file.write(json.dumps({"path": path, "content_hash": text_hash, "resume": resume}) + "\n")
+                    stored = {"content_hash": text_hash, "parsed_at": parsed_at, "resume": resume}
+                    pending_rows.extend({"id": app_id, "parsed_resume": stored} for app_id in application_ids)
+                await flush()
+                stats.report()
+        await flush(force_write=True)
+    finally:
+        if output_file:
+            output_file.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes into JobApplication.parsed_resume")
+    parser.add_argument("source", help="directory or .zip/.tar(.gz) archive of resumes")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="text extraction processes")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="LLM parse calls in flight")
+    parser.add_argument("--batch-size", type=int, default=200, help="applications per DB write")
+    parser.add_argument("--chunk", type=int, default=500, help="files extracted per round")
+    parser.add_argument("--force", action="store_true", help="re-parse even when the stored hash matches")
+    parser.add_argument("--output", help="also append parses (incl. unmatched files) to this JSON-lines file")
+    parser.add_argument("--extract-dir", help="where archive members are unpacked")
+    args = parser.parse_args()
+
+    stats = asyncio.run(
+        ingest(
+            args.source,
+            processes=args.processes,
+            llm_concurrency=args.llm_concurrency,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk,
+            force=args.force,
+            output=args.output,
+            extract_dir=args.extract_dir,
+        )
+    )
+    stats.report(final=True)
+    print(f"Parse cache: {parse_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
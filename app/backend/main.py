@@ -6,18 +6,41 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-from fastapi import Depends, FastAPI, File, HTTPException, UploadFile, status
+import asyncio
+import hashlib
+import json
+import re
+from contextlib import asynccontextmanager
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 # Import the new Anthropic integration
 from app.backend.anthropic_integration import AnthropicInterviewGenerator, check_anthropic_status, get_recommended_models
 
-from app.backend import database, models, schema, security
+from app.backend import database, metrics, models, schema, security
+from app.backend.api.applications import application_router
+from app.backend.api.files import file_router
 from app.backend.api.questions import question_router
+from app.backend.api.tasks import task_router
+from app.backend.api.score import score_router
 from app.backend.api.users import user_router
 # from app.backend.api.questions_score import question_score_router
+from app.backend.service import (
+    job_skills,
+    llm_client,
+    llm_health,
+    llm_telemetry,
+    question_prefetch,
+    resume_ingest,
+    task_queue,
+)
+from app.backend.service.parse_cache import parse_cache
+from app.backend.service.session_store import get_session_store
 from app.backend.utils import create_tables, save_upload_file
 from app.backend.schema import (
     ResumeData,
@@ -36,10 +59,38 @@ from app.backend.schema import (
 from dotenv import load_dotenv
 load_dotenv()
 
-# create tables
-create_tables()
+# Create tables on startup only when asked to (local development);
+# deployments run `python -m app.backend.migrate` instead
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "false").lower() in ("1", "true", "yes")
+
+# Run task workers inside the API process unless dedicated workers are deployed
+TASK_EMBEDDED_WORKER = os.getenv("TASK_EMBEDDED_WORKER", "true").lower() in ("1", "true", "yes")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start embedded task workers and the health monitor; stop them on shutdown"""
+    if AUTO_CREATE_TABLES:
+        await asyncio.to_thread(create_tables)
+    task_worker_stop = asyncio.Event()
+    task_worker = None
+    if TASK_EMBEDDED_WORKER:
+        task_worker = asyncio.create_task(
+            task_queue.run_workers(stop_event=task_worker_stop)
+        )
+    health_worker = asyncio.create_task(llm_health.monitor_loop(task_worker_stop))
+    yield
+    task_worker_stop.set()
+    if task_worker is not None:
+        await task_worker
+    await health_worker
+    # Let streamed follow-ups whose client left finish saving
+    await asyncio.gather(*_followup_tasks, return_exceptions=True)
+    await llm_client.close_client()
+    await database.dispose_async_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS settings for frontend at http://localhost:3000
 app.add_middleware(
@@ -48,9 +99,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.include_router(application_router)
+app.include_router(file_router)
 app.include_router(question_router)
+app.include_router(score_router)
 app.include_router(user_router)
+app.include_router(task_router)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -76,15 +132,16 @@ def initialize_anthropic():
         print("   3. Ensure you have sufficient credits")
         return None
 
-# Try to initialize Claude
-question_generator = initialize_anthropic()
+def _question_item(question: str, skill_tags: Optional[List[str]] = None, reference_notes: str = "") -> Dict:
+    """Initial question in the shape the generators return"""
+    return {"question": question, "reference_notes": reference_notes, "skill_tags": skill_tags or []}
 
 # Fallback generator for when Claude is not available
 class FallbackQuestionGenerator:
     """Simple fallback when Claude is not available"""
     
-    def generate_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> List[str]:
-        """Generate basic questions based on skills analysis"""
+    async def generate_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData) -> List[Dict]:
+        """Generate basic questions based on skills analysis (no grading notes)"""
         
         questions = []
         
@@ -98,29 +155,29 @@ class FallbackQuestionGenerator:
         # Question 1: About matching skills or background
         if matching_skills:
             skill = list(matching_skills)[0]
-            questions.append(f"I see you have experience with {skill}. Can you tell me about a specific project where you used it effectively?")
+            questions.append(_question_item(f"I see you have experience with {skill}. Can you tell me about a specific project where you used it effectively?", [skill]))
         else:
-            questions.append(f"Tell me about your background in {resume_data.domain_expertise[0] if resume_data.domain_expertise else 'your field'} and how it relates to this role.")
+            questions.append(_question_item(f"Tell me about your background in {resume_data.domain_expertise[0] if resume_data.domain_expertise else 'your field'} and how it relates to this role."))
         
         # Question 2: About learning new skills
         if missing_skills:
             skill = list(missing_skills)[0]
-            questions.append(f"This role requires {skill}, which wasn't in your background. How do you typically approach learning new technologies?")
+            questions.append(_question_item(f"This role requires {skill}, which wasn't in your background. How do you typically approach learning new technologies?", [skill]))
         else:
-            questions.append("How do you stay updated with the latest technologies in your field?")
+            questions.append(_question_item("How do you stay updated with the latest technologies in your field?"))
         
         # Question 3: Problem solving
-        questions.append("Describe a challenging technical problem you've encountered recently and walk me through how you solved it.")
+        questions.append(_question_item("Describe a challenging technical problem you've encountered recently and walk me through how you solved it."))
         
         # Question 4: Role-specific
         if jd_data.responsibilities:
-            questions.append(f"One of the key responsibilities is '{jd_data.responsibilities[0][:100]}...'. How would you approach this?")
+            questions.append(_question_item(f"One of the key responsibilities is '{jd_data.responsibilities[0][:100]}...'. How would you approach this?"))
         else:
-            questions.append(f"What interests you most about working at {jd_data.company} in this role?")
+            questions.append(_question_item(f"What interests you most about working at {jd_data.company} in this role?"))
         
         return questions
     
-    def generate_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str) -> Optional[str]:
+    async def generate_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str) -> Optional[str]:
         """Generate simple follow-up questions"""
         
         answer_length = len(candidate_answer.split())
@@ -161,6 +218,29 @@ class FallbackQuestionGenerator:
         
         return None
     
+    async def stream_initial_questions(self, resume_data: ResumeData, jd_data: JobDescriptionData):
+        """Rule-based, so the whole result arrives as a single chunk"""
+        yield json.dumps({"questions": await self.generate_initial_questions(resume_data, jd_data)})
+    
+    def parse_initial_questions(self, response_text: str, jd_data: JobDescriptionData) -> List[Dict]:
+        try:
+            return json.loads(response_text)["questions"]
+        except (ValueError, KeyError, TypeError):
+            return []
+    
+    async def stream_followup_question(self, session: InterviewSession, current_question: str, candidate_answer: str):
+        """Rule-based, so the whole result arrives as a single chunk"""
+        followup = await self.generate_followup_question(session, current_question, candidate_answer)
+        if followup:
+            yield followup
+    
+    def parse_followup_response(self, response_text: str) -> Optional[str]:
+        return response_text.strip() or None
+    
+    async def generate_followup_candidates(self, session: InterviewSession, current_question: str) -> Optional[Dict]:
+        """Rule-based follow-ups are instant, so there is nothing to prefetch"""
+        return None
+    
     def get_model_info(self):
         return {
             "model_name": "fallback",
@@ -169,28 +249,43 @@ class FallbackQuestionGenerator:
             "capabilities": ["basic_questions", "simple_followups"]
         }
 
-# Use fallback if Claude failed to initialize
-if question_generator is None:
-    question_generator = FallbackQuestionGenerator()
-    print("⚠️  Using fallback question generator")
+_question_generator = None
+
+
+def get_question_generator():
+    """Claude generator, built on first use so imports never reach the network"""
+    global _question_generator
+    if _question_generator is None:
+        _question_generator = initialize_anthropic()
+        # Use fallback if Claude failed to initialize
+        if _question_generator is None:
+            _question_generator = FallbackQuestionGenerator()
+            print("⚠️  Using fallback question generator")
+    return _question_generator
 
 @app.post("/login", response_model=schema.TokenResponse)
 async def login(
     user_data: schema.UserLogin,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if not user or not security.verify_password(
-        user_data.password, user.hashed_password
-    ):
+    user = await db.scalar(select(models.User).where(models.User.email == user_data.email))
+    # bcrypt runs in the bounded hashing pool, not on the event loop
+    valid, new_hash = await security.verify_and_update_password(
+        user_data.password, user.hashed_password if user else None
+    )
+    if not user or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    if new_hash:
+        # Stored hash used an old cost factor (BCRYPT_ROUNDS changed)
+        user.hashed_password = new_hash
+        await db.commit()
 
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=security.user_claims(user), expires_delta=access_token_expires
     )
     return {
         "access_token": access_token,
@@ -237,60 +332,130 @@ def create_job(
 
     # Create new job with recruiter_id
     new_job = models.Job(**job_data)
+    job_skills.index_job_skills(db, new_job)
     db.add(new_job)
     db.commit()
     db.refresh(new_job)
 
     return {"message": "Job created successfully"}
 
-@app.get("/jobs", response_model=list[schema.JobResponse])
+# Columns that can be requested through GET /jobs?fields=...
+JOB_LIST_COLUMNS = {
+    "job_id": models.Job.job_id,
+    "title": models.Job.title,
+    "company": models.Job.company,
+    "location": models.Job.location,
+    "experience": models.Job.experience,
+    "job_overview": models.Job.job_overview,
+    "key_responsibilities": models.Job.key_responsibilities,
+    "must_have_skills": models.Job.must_have_skills,
+    "good_to_have_skills": models.Job.good_to_have_skills,
+    "recruiter_id": models.Job.recruiter_id,
+    "job_type": models.Job.job_type,
+    "posted_date": models.Job.posted_date,
+}
+JOB_LIST_FIELDS = list(JOB_LIST_COLUMNS) + ["recruiter_name", "applications_count"]
+
+
+def filter_jobs(query, location, job_type, skill, recruiter_id):
+    """Apply the GET /jobs filters to a query over models.Job"""
+    if location:
+        query = query.where(models.Job.location.ilike(f"%{location}%"))
+    if job_type:
+        query = query.where(func.lower(models.Job.job_type) == job_type.lower())
+    if skill:
+        # Exact match on the normalized job_skills index
+        query = query.where(models.Job.job_id.in_(job_skills.jobs_with_skill(skill)))
+    if recruiter_id is not None:
+        query = query.where(models.Job.recruiter_id == recruiter_id)
+    return query
+
+
+@app.get("/jobs", response_model=list[schema.JobListItem])
 def get_jobs(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="job_id to continue after (X-Next-Cursor)"),
+    location: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skill: Optional[str] = None,
+    recruiter_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: models.User = Depends(security.get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    base_query = (
-        db.query(
-            models.Job,
-            models.User.name.label("recruiter_name"),
-            func.count(models.JobApplication.id).label(
-                "applications_count"
-            ),  # Changed from db.func to func
+    if current_user.role == schema.UserRole.HR:
+        # HR sees only their posted jobs
+        recruiter_id = current_user.id
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else JOB_LIST_FIELDS
+    unknown = set(requested) - set(JOB_LIST_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
         )
-        .join(models.User, models.Job.recruiter_id == models.User.id)
-        .outerjoin(
-            models.JobApplication, models.Job.job_id == models.JobApplication.job_id
+    if "job_id" not in requested:
+        requested = ["job_id"] + requested
+
+    # Cheap fingerprint of the filtered result set; answers If-None-Match polls
+    # without loading or serializing any job rows
+    filtered_ids = filter_jobs(
+        select(models.Job.job_id), location, job_type, skill, recruiter_id
+    ).subquery()
+    job_count, max_job_id, application_count = db.execute(
+        select(
+            select(func.count()).select_from(filtered_ids).scalar_subquery(),
+            select(func.max(filtered_ids.c.job_id)).scalar_subquery(),
+            select(func.count(models.JobApplication.id))
+            .where(models.JobApplication.job_id.in_(select(filtered_ids.c.job_id)))
+            .scalar_subquery(),
         )
-        .group_by(models.Job.job_id, models.User.name)
-    )
+    ).one()
+    etag_source = f"{request.url.query}|{current_user.id}|{job_count}|{max_job_id}|{application_count}"
+    etag = f'W/"{hashlib.sha1(etag_source.encode()).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    if current_user.role == schema.UserRole.HR:
-        # HR sees only their posted jobs
-        jobs = base_query.filter(models.Job.recruiter_id == current_user.id).all()
-    else:
-        # Candidates see all jobs
-        jobs = base_query.all()
-    # Convert the result to a list of dictionaries
-    job_list = []
-    for job, recruiter_name, applications_count in jobs:
-        job_dict = {
-            "job_id": job.job_id,
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "experience": job.experience,
-            "job_overview": job.job_overview,
-            "key_responsibilities": job.key_responsibilities,
-            "must_have_skills": job.must_have_skills,
-            "good_to_have_skills": job.good_to_have_skills,
-            "recruiter_id": job.recruiter_id,
-            "recruiter_name": recruiter_name,
-            "job_type": job.job_type,
-            "applications_count": applications_count,
-            "posted_date": job.posted_date,
-        }
-        job_list.append(job_dict)
+    # Only select the requested columns; large Text columns stay in the DB
+    columns = [JOB_LIST_COLUMNS[f].label(f) for f in requested if f in JOB_LIST_COLUMNS]
+    query = select(*columns)
+    if "recruiter_name" in requested:
+        query = query.add_columns(models.User.name.label("recruiter_name")).join(
+            models.User, models.Job.recruiter_id == models.User.id
+        )
+    if "applications_count" in requested:
+        query = query.add_columns(
+            select(func.count(models.JobApplication.id))
+            .where(models.JobApplication.job_id == models.Job.job_id)
+            .correlate(models.Job)
+            .scalar_subquery()
+            .label("applications_count")
+        )
+    query = filter_jobs(query, location, job_type, skill, recruiter_id)
+    if cursor is not None:
+        query = query.where(models.Job.job_id < cursor)
+    # Newest first, one extra row to know whether there is a next page
+    rows = db.execute(query.order_by(models.Job.job_id.desc()).limit(limit + 1)).all()
+
+    headers = {"ETag": etag}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1].job_id)
 
-    return job_list
+    return ORJSONResponse([dict(row._mapping) for row in rows], headers=headers)
+
+@app.post("/jobs/skill-match", response_model=list[schema.JobSkillMatch])
+def match_jobs_by_skills(
+    request: schema.SkillMatchRequest,
+    current_user: models.User = Depends(security.get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    """Rank jobs by overlap with a candidate's primary and secondary skills"""
+    rows = job_skills.rank_jobs_by_skills(
+        db, request.primary_skills, request.secondary_skills, limit=request.limit
+    )
+    return [schema.JobSkillMatch(**row._mapping) for row in rows]
 
 @app.post(
     "/apply",
@@ -301,145 +466,426 @@ async def apply_for_job(
     application: schema.JobApplicationCreate = Depends(),
     resume: UploadFile = File(...),
     current_user: models.User = Depends(security.candidate_required),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     # Check if job exists
-    job = db.query(models.Job).filter(models.Job.job_id == application.job_id).first()
+    job = await db.get(models.Job, application.job_id)
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
 
     # Save resume file and create application
-    resume_path = save_upload_file(resume, application.email)
+    resume_path = await save_upload_file(resume)
 
     new_application = models.JobApplication(
         **application.model_dump(), resume_path=resume_path
     )
     db.add(new_application)
-    db.commit()
-    db.refresh(new_application)
+    await db.flush()
+
+    # Text extraction, parsing and screening run on the task workers
+    parse_task = await task_queue.enqueue_async(
+        db, "parse_resume", {"application_id": new_application.id}
+    )
+    await db.commit()
 
     return schema.JobApplicationResponse(
         **application.model_dump(),
         id=new_application.id,
         resume_path=resume_path,
+        parse_task_id=parse_task.id,
         message="Application submitted successfully"
     )
 
-# In-memory storage for interview sessions (use database in production)
-interview_sessions: Dict[str, InterviewSession] = {}
+# Interview session storage; backend selected with SESSION_STORE (memory, sql, redis)
+session_store = get_session_store()
+
+async def resolve_interview_inputs(request: StartInterviewRequest, db: AsyncSession):
+    """Resume and JD data for an interview, from the stored application parse if given"""
+    if request.application_id is None:
+        if request.resume_data is None or request.jd_data is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide application_id, or both resume_data and jd_data",
+            )
+        return request.resume_data, request.jd_data
+
+    application = await db.get(
+        models.JobApplication,
+        request.application_id,
+        options=[selectinload(models.JobApplication.job)],
+    )
+    if not application:
+        raise HTTPException(status_code=404, detail="Job application not found")
+
+    resume_data = request.resume_data
+    if resume_data is None:
+        resume = await resume_ingest.get_or_parse_resume(application)
+        if "error" in resume:
+            raise HTTPException(status_code=422, detail=f"Resume could not be parsed: {resume['error']}")
+        resume_data = resume_ingest.resume_to_resume_data(application, resume)
+
+    jd_data = request.jd_data or resume_ingest.job_to_jd_data(application.job)
+    return resume_data, jd_data
+
+async def _create_interview_session(
+    resume_data: ResumeData,
+    jd_data: JobDescriptionData,
+    initial_questions: List[Dict],
+    llm_usage: Optional[Dict] = None,
+) -> StartInterviewResponse:
+    """Store a new session for the generated questions and describe it"""
+    # Ensure we have at least one question
+    if not initial_questions:
+        initial_questions = [_question_item("Tell me about your background and what interests you about this role.")]
+    
+    # Create interview session
+    session = InterviewSession(
+        session_id=str(uuid.uuid4()),
+        resume_data=resume_data,
+        jd_data=jd_data,
+        current_question_index=0,
+        questions=[item["question"] for item in initial_questions],
+        question_responses=[],
+        status="active",
+        created_at=datetime.now(),
+        # Kept for scoring; never sent to the candidate
+        question_notes=[
+            {"reference_notes": item.get("reference_notes", ""), "skill_tags": item.get("skill_tags", [])}
+            for item in initial_questions
+        ],
+        # Spend of the question-generation call(s) made before the session existed
+        llm_usage=llm_usage or {},
+    )
+    
+    # Store session
+    await session_store.create(session)
+    question_prefetch.schedule(session_store, get_question_generator(), session)
+    
+    return StartInterviewResponse(
+        session_id=session.session_id,
+        first_question=session.questions[0],
+        total_initial_questions=len(session.questions)
+    )
 
 @app.post("/start-interview", response_model=StartInterviewResponse)
-async def start_interview(request: StartInterviewRequest):
+async def start_interview(request: StartInterviewRequest, db: AsyncSession = Depends(database.get_async_db)):
     """Start a new interview session"""
+    resume_data, jd_data = await resolve_interview_inputs(request, db)
     try:
-        # Generate session ID
-        session_id = str(uuid.uuid4())
-        
         # Generate initial questions
-        initial_questions = question_generator.generate_initial_questions(
-            request.resume_data, 
-            request.jd_data
-        )
-        
-        # Ensure we have at least one question
-        if not initial_questions:
-            initial_questions = ["Tell me about your background and what interests you about this role."]
-        
-        # Create interview session
-        session = InterviewSession(
-            session_id=session_id,
-            resume_data=request.resume_data,
-            jd_data=request.jd_data,
-            current_question_index=0,
-            questions=initial_questions,
-            question_responses=[],
-            status="active",
-            created_at=datetime.now()
-        )
-        
-        # Store session
-        interview_sessions[session_id] = session
-        
-        return StartInterviewResponse(
-            session_id=session_id,
-            first_question=initial_questions[0],
-            total_initial_questions=len(initial_questions)
-        )
+        with llm_telemetry.collect_usage() as usage:
+            initial_questions = await get_question_generator().generate_initial_questions(
+                resume_data, 
+                jd_data
+            )
+        return await _create_interview_session(resume_data, jd_data, initial_questions, usage.by_site)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting interview: {str(e)}")
 
+def _sse_event(event: str, data: Dict) -> str:
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# A complete "question": "..." member of the generators' JSON output
+_STREAMED_QUESTION = re.compile(r'"question"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _streamed_questions(text: str) -> List[str]:
+    """Question strings completed so far in a partial initial-questions response"""
+    questions = []
+    for match in _STREAMED_QUESTION.finditer(text):
+        try:
+            questions.append(json.loads(f'"{match.group(1)}"', strict=False))
+        except ValueError:
+            continue
+    return questions
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/start-interview/stream")
+async def start_interview_stream(request: StartInterviewRequest, db: AsyncSession = Depends(database.get_async_db)):
+    """Start a new interview session, streaming question generation as server-sent events
+
+    Emits a "token" event ({"text": ...}) with each question's text as soon as
+    Claude has written it, then a final "session" event with the
+    StartInterviewResponse, or an "error" event. The raw output also holds
+    each question's grading notes, so it is never forwarded as is.
+    """
+    resume_data, jd_data = await resolve_interview_inputs(request, db)
+    generator = get_question_generator()
+
+    async def events():
+        text = ""
+        shown = 0
+        try:
+            with llm_telemetry.collect_usage() as usage:
+                try:
+                    async for delta in generator.stream_initial_questions(resume_data, jd_data):
+                        text += delta
+                        questions = _streamed_questions(text)
+                        for question in questions[shown:]:
+                            yield _sse_event("token", {"text": question + "\n"})
+                        shown = len(questions)
+                except Exception as e:
+                    # Same as the non-streaming path: fall back to stock questions
+                    print(f"Error streaming questions: {e}")
+                    text = ""
+            initial_questions = generator.parse_initial_questions(text, jd_data)
+            response = await _create_interview_session(resume_data, jd_data, initial_questions, usage.by_site)
+            yield _sse_event("session", response.model_dump(mode="json"))
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error starting interview: {str(e)}"})
+
+    return _sse_response(events())
+
+async def _get_active_session(session_id: str) -> InterviewSession:
+    session = await session_store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    
+    if session.status == "generating":
+        raise HTTPException(status_code=409, detail="The next question is still being written; try again shortly")
+    if session.status != "active":
+        raise HTTPException(status_code=400, detail="Interview session is not active")
+    return session
+
+def _record_answer(session: InterviewSession, answer: str):
+    """Append the answer to the current question; returns (question, QuestionResponse)"""
+    current_question = session.questions[session.current_question_index]
+    qa_response = schema.QuestionResponse(
+        question=current_question,
+        answer=answer,
+        timestamp=datetime.now()
+    )
+    session.question_responses.append(qa_response)
+    return current_question, qa_response
+
+def _next_pregenerated_question(session: InterviewSession) -> Optional[str]:
+    if session.current_question_index + 1 < len(session.questions):
+        session.current_question_index += 1
+        return session.questions[session.current_question_index]
+    return None
+
+def _apply_followup(session: InterviewSession, followup: Optional[str]) -> Optional[str]:
+    """Add a generated follow-up to the session, or complete the interview without one"""
+    if followup:
+        session.questions.append(followup)
+        session.current_question_index += 1
+        return followup
+    # End interview
+    session.status = "completed"
+    return None
+
+async def _save_llm_usage(session_id: str, usage: llm_telemetry.UsageCollector) -> None:
+    """Add the LLM calls collected for a request to the session's cost summary"""
+    if usage.by_site:
+        await session_store.add_usage(session_id, usage.by_site)
+
+async def _finish_answer(
+    session: InterviewSession,
+    expected_index: int,
+    qa_response: QuestionResponse,
+    next_question: Optional[str],
+    new_question: Optional[str],
+    usage: llm_telemetry.UsageCollector,
+) -> AnswerQuestionResponse:
+    # Persist only this turn (the answer and any new follow-up question), and
+    # only if no other request answered the same question in the meantime
+    recorded = await session_store.append_turn(
+        session.session_id,
+        expected_index,
+        qa_response,
+        current_question_index=session.current_question_index,
+        status=session.status,
+        new_question=new_question,
+    )
+    return await _turn_recorded(session, recorded, next_question, usage)
+
+def _turn_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="This question was already answered or the session changed; reload the session",
+    )
+
+async def _turn_recorded(
+    session: InterviewSession,
+    recorded: bool,
+    next_question: Optional[str],
+    usage: llm_telemetry.UsageCollector,
+) -> AnswerQuestionResponse:
+    await _save_llm_usage(session.session_id, usage)
+    if not recorded:
+        raise _turn_conflict()
+    if session.status == "active":
+        # Prepare the next follow-up while the candidate answers this question
+        question_prefetch.schedule(session_store, get_question_generator(), session)
+    else:
+        question_prefetch.cancel(session.session_id)
+    
+    return AnswerQuestionResponse(
+        next_question=next_question,
+        is_interview_complete=session.status == "completed",
+        question_number=len(session.question_responses),
+        session_status=session.status
+    )
+
+# Streamed follow-ups still being written, kept referenced until they finish
+_followup_tasks = set()
+
+def _forget_followup(task: asyncio.Task) -> None:
+    _followup_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error saving streamed follow-up: {task.exception()}")
+
+async def _write_followup(
+    session: InterviewSession,
+    expected_index: int,
+    current_question: str,
+    answer: str,
+    deltas: asyncio.Queue,
+) -> AnswerQuestionResponse:
+    """Stream the follow-up into deltas, then complete the turn stored as "generating"
+
+    Runs as its own task, so a client that disconnects mid-stream does not
+    stop it: the question is still saved and the session becomes active again.
+    """
+    generator = get_question_generator()
+    text = ""
+    with llm_telemetry.collect_usage() as usage:
+        try:
+            async for delta in generator.stream_followup_question(session, current_question, answer):
+                text += delta
+                deltas.put_nowait(delta)
+            followup = generator.parse_followup_response(text)
+        except Exception as e:
+            print(f"Error generating follow-up: {e}")
+            # End interview gracefully if we can't generate more questions
+            followup = None
+        finally:
+            deltas.put_nowait(None)
+    next_question = _apply_followup(session, followup)
+    recorded = await session_store.add_followup(
+        session.session_id,
+        expected_index,
+        current_question_index=session.current_question_index,
+        status=session.status,
+        new_question=next_question,
+    )
+    return await _turn_recorded(session, recorded, next_question, usage)
+
 @app.post("/answer-question", response_model=AnswerQuestionResponse)
 async def answer_question(request: AnswerQuestionRequest):
     """Submit answer and get next question"""
     try:
-        # Get session
-        session = interview_sessions.get(request.session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Interview session not found")
-        
-        if session.status != "active":
-            raise HTTPException(status_code=400, detail="Interview session is not active")
-        
-        # Get current question
-        current_question = session.questions[session.current_question_index]
-        
-        # Store the Q&A
-        qa_response = schema.QuestionResponse(
-            question=current_question,
-            answer=request.answer,
-            timestamp=datetime.now()
-        )
-        session.question_responses.append(qa_response)
-        
-        # Determine next question
-        next_question = None
-        is_complete = False
+        session = await _get_active_session(request.session_id)
+        expected_index = session.current_question_index
+        current_question, qa_response = _record_answer(session, request.answer)
         
         # Check if we have more pre-generated questions
-        if session.current_question_index + 1 < len(session.questions):
-            session.current_question_index += 1
-            next_question = session.questions[session.current_question_index]
-        else:
-            # Generate dynamic follow-up question
-            try:
-                followup = question_generator.generate_followup_question(
-                    session, current_question, request.answer
-                )
-                
-                if followup:
-                    session.questions.append(followup)
-                    session.current_question_index += 1
-                    next_question = followup
+        next_question = _next_pregenerated_question(session)
+        new_question = None
+        with llm_telemetry.collect_usage() as usage:
+            if next_question is None:
+                candidates = await question_prefetch.take(session)
+                if candidates is not None:
+                    followup = question_prefetch.choose_followup(candidates, request.answer)
                 else:
-                    # End interview
-                    session.status = "completed"
-                    is_complete = True
-                    
-            except Exception as e:
-                print(f"Error generating follow-up: {e}")
-                # End interview gracefully if we can't generate more questions
-                session.status = "completed"
-                is_complete = True
+                    # Generate dynamic follow-up question
+                    try:
+                        followup = await get_question_generator().generate_followup_question(
+                            session, current_question, request.answer
+                        )
+                    except Exception as e:
+                        print(f"Error generating follow-up: {e}")
+                        # End interview gracefully if we can't generate more questions
+                        followup = None
+                next_question = new_question = _apply_followup(session, followup)
         
-        return AnswerQuestionResponse(
-            next_question=next_question,
-            is_interview_complete=is_complete,
-            question_number=len(session.question_responses),
-            session_status=session.status
-        )
+        return await _finish_answer(session, expected_index, qa_response, next_question, new_question, usage)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing answer: {str(e)}")
 
+@app.post("/answer-question/stream")
+async def answer_question_stream(request: AnswerQuestionRequest):
+    """Submit answer and stream the next question as server-sent events
+
+    Emits "token" events ({"text": ...}) while Claude writes a follow-up
+    (none when a pre-generated question is next), then a final "question"
+    event with the AnswerQuestionResponse carrying the cleaned question, or
+    an "error" event (with status_code 409 when the question was already
+    answered by another request).
+
+    Before Claude starts, the answer is stored and the session marked
+    "generating"; the follow-up is written by a separate task, so both are
+    kept even if the client disconnects mid-stream.
+    """
+    session = await _get_active_session(request.session_id)
+    expected_index = session.current_question_index
+    current_question, qa_response = _record_answer(session, request.answer)
+
+    async def events():
+        try:
+            next_question = _next_pregenerated_question(session)
+            new_question = None
+            with llm_telemetry.collect_usage() as usage:
+                if next_question is None:
+                    candidates = await question_prefetch.take(session)
+                    if candidates is not None:
+                        # Prefetched while the candidate was answering: one chunk, no LLM wait
+                        followup = question_prefetch.choose_followup(candidates, request.answer)
+                        if followup:
+                            yield _sse_event("token", {"text": followup})
+                    else:
+                        recorded = await session_store.append_turn(
+                            session.session_id,
+                            expected_index,
+                            qa_response,
+                            current_question_index=expected_index,
+                            status="generating",
+                        )
+                        if not recorded:
+                            raise _turn_conflict()
+                        deltas = asyncio.Queue()
+                        task = asyncio.create_task(
+                            _write_followup(session, expected_index, current_question, request.answer, deltas)
+                        )
+                        _followup_tasks.add(task)
+                        task.add_done_callback(_forget_followup)
+                        while True:
+                            delta = await deltas.get()
+                            if delta is None:
+                                break
+                            yield _sse_event("token", {"text": delta})
+                        response = await task
+                        yield _sse_event("question", response.model_dump(mode="json"))
+                        return
+                    next_question = new_question = _apply_followup(session, followup)
+            response = await _finish_answer(
+                session, expected_index, qa_response, next_question, new_question, usage
+            )
+            yield _sse_event("question", response.model_dump(mode="json"))
+        except HTTPException as e:
+            yield _sse_event("error", {"detail": e.detail, "status_code": e.status_code})
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error processing answer: {str(e)}"})
+
+    return _sse_response(events())
+
 @app.get("/session/{session_id}", response_model=InterviewSessionResponse)
 async def get_session(session_id: str):
     """Get interview session details"""
-    session = interview_sessions.get(session_id)
+    session = await session_store.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Interview session not found")
     
@@ -456,20 +902,76 @@ async def get_session(session_id: str):
 @app.post("/end-interview")
 async def end_interview(request: EndInterviewRequest):
     """End interview session manually"""
-    session = interview_sessions.get(request.session_id)
+    session = await session_store.get(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Interview session not found")
     
-    session.status = "ended"
+    await session_store.set_status(request.session_id, "ended")
+    question_prefetch.cancel(request.session_id)
     return {"message": "Interview ended successfully", "session_id": request.session_id}
 
+@app.post("/session/{session_id}/score")
+async def score_session(session_id: str):
+    """Score the session's answers, grading against the notes stored with each question"""
+    # Imported lazily: scoring is not on the interview path
+    from app.backend.service.question_analysis import QuestionAnalysisService
+
+    session = await session_store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    if not session.question_responses:
+        raise HTTPException(status_code=400, detail="Interview session has no answers yet")
+
+    notes_by_question = dict(zip(session.questions, session.question_notes))
+    qa_pairs = []
+    for position, qa in enumerate(session.question_responses, 1):
+        notes = notes_by_question.get(qa.question, {})
+        qa_pairs.append({
+            "question_id": position,
+            "question": qa.question,
+            "answer": qa.answer,
+            "reference_notes": notes.get("reference_notes", ""),
+            "skill": ", ".join(notes.get("skill_tags") or []),
+        })
+
+    must_have = session.jd_data.skills.must_have
+    with llm_telemetry.collect_usage() as usage:
+        try:
+            results = await QuestionAnalysisService().analyze_questions(
+                qa_pairs,
+                yoe=session.jd_data.experience_required.min_years,
+                skill=must_have[0] if must_have else "General",
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Question analysis failed: {str(e)}")
+        finally:
+            await _save_llm_usage(session_id, usage)
+    return {"session_id": session_id, "results": results}
+
+@app.get("/session/{session_id}/cost")
+async def session_cost(session_id: str):
+    """Estimated LLM spend of an interview session, in total and by call site"""
+    session = await session_store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+
+    total: Dict = {}
+    for totals in session.llm_usage.values():
+        llm_telemetry.add_totals(total, totals)
+    by_site = sorted(
+        ({"site": site, **totals} for site, totals in session.llm_usage.items()),
+        key=lambda row: row.get("cost_usd", 0),
+        reverse=True,
+    )
+    return {"session_id": session_id, "total": total, "by_site": by_site}
+
 @app.get("/sessions")
 async def list_sessions():
     """List all interview sessions"""
     sessions_summary = []
-    for session_id, session in interview_sessions.items():
+    for session in await session_store.list_sessions():
         sessions_summary.append({
-            "session_id": session_id,
+            "session_id": session.session_id,
             "candidate_name": f"{session.resume_data.candidate_first_name} {session.resume_data.candidate_last_name}",
             "company": session.jd_data.company,
             "status": session.status,
@@ -483,20 +985,39 @@ async def list_sessions():
 
 @app.get("/claude/status")
 async def claude_status():
-    """Check Claude API status"""
-    return check_anthropic_status()
+    """Cached Claude API status from real traffic and non-billing probes"""
+    return await check_anthropic_status()
 
 @app.get("/claude/models")
 async def claude_models():
     """Get recommended Claude models for interviews"""
     return {
         "recommended_models": get_recommended_models(),
-        "current_status": check_anthropic_status()
+        "current_status": await check_anthropic_status()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Process metrics (DB pool, LLM calls, ...) in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm/usage")
+async def llm_usage():
+    """LLM calls since this process started, per call site and model, most expensive first
+
+    Latency percentiles cover the last LLM_LATENCY_WINDOW calls of each row.
+    """
+    return {"calls": llm_telemetry.usage_summary()}
+
+@app.get("/cache/parse-stats")
+async def parse_cache_stats():
+    """Hit/miss counters for the parse_with_ai result cache"""
+    return parse_cache.stats()
+
 @app.get("/claude/model-info")
 async def current_model_info():
     """Get current model information"""
+    question_generator = get_question_generator()
     if hasattr(question_generator, 'get_model_info'):
         return question_generator.get_model_info()
     else:
@@ -504,18 +1025,44 @@ async def current_model_info():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (cached state only, safe to poll often)"""
     model_info = await current_model_info()
-    claude_status_info = check_anthropic_status()
+    claude_status_info = await check_anthropic_status()
     
     return {
         "status": "healthy",
         "timestamp": datetime.now(),
         "claude_status": claude_status_info["status"],
         "current_model": model_info,
+        "dependencies": {
+            "claude": claude_status_info,
+            "chat_completion": llm_health.health_monitor.status(llm_health.CHAT),
+            "database": llm_health.health_monitor.status(llm_health.DATABASE),
+        },
         "version": "1.0.0"
     }
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness(response: Response):
+    """Readiness probe from cached dependency state; 503 when not ready"""
+    database_status = llm_health.health_monitor.status(llm_health.DATABASE)
+    claude_status_info = await check_anthropic_status()
+    ready = database_status["status"] in ("connected", "unknown")
+    if llm_health.HEALTH_READY_REQUIRES_LLM:
+        ready = ready and claude_status_info["status"] in ("connected", "degraded", "unknown")
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "not_ready",
+        "database": database_status["status"],
+        "claude": claude_status_info["status"],
+    }
+
 @app.get("/jobs/{job_id}")
 def get_jobs(
     job_id: int,
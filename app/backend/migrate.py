@@ -0,0 +1,124 @@
+"""
+Create or update the database schema.
+
+Usage:
+    python -m app.backend.migrate
+
+Run once per deploy, before starting API or worker processes; the app itself
+no longer touches the schema on import or startup. Set AUTO_CREATE_TABLES=true
+to have the API create tables on startup instead (local development).
+
+create_all only creates missing tables, so columns, constraints and indexes
+added to tables that already exist are applied here as well. Every step
+checks the live schema first and is safe to re-run.
+"""
+
+import sys
+
+from sqlalchemy import inspect, text
+
+# models registers every table on Base.metadata
+from app.backend import database, models  # noqa: F401
+from app.backend.service.session_store import SESSION_STORE_URL, SQLSessionStore
+from app.backend.utils import create_tables
+
+QUESTION_SCORES_UNIQUE = "uq_question_scores_application_question"
+
+
+def _add_question_scores_unique(conn) -> None:
+    """One score per (application_id, question_id); batch scoring upserts on it"""
+    inspector = inspect(conn)
+    existing = {c["name"] for c in inspector.get_unique_constraints("question_scores")}
+    existing |= {i["name"] for i in inspector.get_indexes("question_scores") if i["unique"]}
+    if QUESTION_SCORES_UNIQUE in existing:
+        return
+
+    # Keep the newest score of each pair, as the upsert would have
+    removed = conn.execute(
+        text(
+            "DELETE FROM question_scores WHERE id NOT IN ("
+            "SELECT MAX(id) FROM question_scores GROUP BY application_id, question_id)"
+        )
+    ).rowcount
+    if removed:
+        print(f"Removed {removed} duplicate question score(s)")
+
+    if conn.dialect.name == "sqlite":
+        # SQLite cannot add constraints to a table; a unique index serves ON CONFLICT
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX {QUESTION_SCORES_UNIQUE} "
+                "ON question_scores (application_id, question_id)"
+            )
+        )
+    else:
+        conn.execute(
+            text(
+                f"ALTER TABLE question_scores ADD CONSTRAINT {QUESTION_SCORES_UNIQUE} "
+                "UNIQUE (application_id, question_id)"
+            )
+        )
+    print(f"Added {QUESTION_SCORES_UNIQUE}")
+
+
+def _add_missing_columns(conn, tables) -> None:
+    """Nullable columns declared on the models but missing from tables created earlier"""
+    inspector = inspect(conn)
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                # Needs a backfill first; not something to guess at here
+                raise RuntimeError(f"Missing NOT NULL column {table.name}.{column.name}")
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            print(f"Added column {table.name}.{column.name}")
+
+
+def _create_missing_indexes(conn, tables) -> None:
+    """Indexes declared on the models but missing from tables created earlier"""
+    inspector = inspect(conn)
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=conn)
+                print(f"Created index {index.name}")
+
+
+def upgrade_existing_tables(engine=None, tables=None) -> bool:
+    """Bring tables that already exist up to the models (all tables by default)"""
+    engine = engine or database.engine
+    tables = tables or database.Base.metadata.sorted_tables
+    try:
+        with engine.begin() as conn:
+            _add_missing_columns(conn, tables)
+            if any(table.name == "question_scores" for table in tables):
+                _add_question_scores_unique(conn)
+            _create_missing_indexes(conn, tables)
+        return True
+    except Exception as e:
+        print(f"Error upgrading tables: {e}")
+        return False
+
+
+def main() -> int:
+    if not create_tables() or not upgrade_existing_tables():
+        return 1
+    # Interview sessions may live in a separate database
+    if SESSION_STORE_URL:
+        store = SQLSessionStore()
+        store.create_tables()
+        if not upgrade_existing_tables(store.engine, SQLSessionStore.TABLES):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
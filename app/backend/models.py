@@ -1,7 +1,8 @@
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import (Column, DateTime, Enum, ForeignKey, Integer, String,
-                        Text)
+from sqlalchemy import (JSON, Boolean, Column, DateTime, Enum, ForeignKey,
+                        Index, Integer, String, Text, UniqueConstraint)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -37,23 +38,40 @@ class Job(Base):
     key_responsibilities = Column(Text, nullable=False)
     must_have_skills = Column(Text, nullable=False)
     good_to_have_skills = Column(Text, nullable=True)  # optional field
-    recruiter_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    recruiter_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
     job_type = Column(String, nullable=False)
     posted_date = Column(DateTime, nullable=False, server_default=func.now())
 
     recruiter = relationship("User", back_populates="posted_jobs")
     applications = relationship("JobApplication", back_populates="job")
+    skills = relationship("JobSkill", back_populates="job", cascade="all, delete-orphan")
+
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+    __table_args__ = (
+        UniqueConstraint("job_id", "skill", name="uq_job_skills_job_skill"),
+        # Skill lookups drive search; job_id is included so the index covers the join
+        Index("ix_job_skills_skill_job", "skill", "job_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False, index=True)
+    skill = Column(String, nullable=False)  # normalized, see service.job_skills
+    is_must_have = Column(Boolean, nullable=False, default=True)
+
+    job = relationship("Job", back_populates="skills")
 
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
 
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey("jobs.job_id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.job_id"), nullable=False, index=True)
     first_name = Column(String, nullable=False)
     middle_name = Column(String, nullable=True)
     last_name = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, index=True)
     experience_years = Column(Integer, nullable=False)
     experience_months = Column(Integer, nullable=False)
     current_city = Column(String, nullable=False)
@@ -94,6 +112,10 @@ class QuestionAnswer(Base):
 
 class QuestionScore(Base):
     __tablename__ = "question_scores"
+    __table_args__ = (
+        # One score per question per application; batch scoring upserts on it
+        UniqueConstraint("application_id", "question_id", name="uq_question_scores_application_question"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False)
@@ -115,3 +137,78 @@ class QuestionScore(Base):
     candidate = relationship("User", back_populates="question_scores")
     # Relationship to Question
     question = relationship("Question", back_populates="question_scores")
+
+
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, index=True)
+    payload = Column(JSONB, nullable=False)
+    # queued -> running -> succeeded | failed (running goes back to queued on retry)
+    status = Column(String, nullable=False, default="queued", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    # Set from Python (UTC) so backoff arithmetic does not depend on DB timezone
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class InterviewSessionRecord(Base):
+    __tablename__ = "interview_sessions"
+
+    session_id = Column(String, primary_key=True, index=True)
+    # Generic JSON so the session store also runs on SQLite
+    resume_data = Column(JSON, nullable=False)
+    jd_data = Column(JSON, nullable=False)
+    current_question_index = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    prefetched_followups = Column(JSON, nullable=True)
+    question_notes = Column(JSON, nullable=True)
+    llm_usage = Column(JSON, nullable=True)
+
+    questions = relationship(
+        "InterviewSessionQuestion",
+        order_by="InterviewSessionQuestion.position",
+        cascade="all, delete-orphan",
+    )
+    responses = relationship(
+        "InterviewSessionResponse",
+        order_by="InterviewSessionResponse.position",
+        cascade="all, delete-orphan",
+    )
+
+
+class InterviewSessionQuestion(Base):
+    __tablename__ = "interview_session_questions"
+
+    session_id = Column(
+        String,
+        ForeignKey("interview_sessions.session_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    position = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+
+
+class InterviewSessionResponse(Base):
+    __tablename__ = "interview_session_responses"
+
+    session_id = Column(
+        String,
+        ForeignKey("interview_sessions.session_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    position = Column(Integer, primary_key=True)
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
@@ -64,14 +64,14 @@ Return JSON in this format:
 """
 
 
-SCREEN_CANDIDATE_PROMPT = """
-You are an experienced technical recruiter. You will receive TWO JSON objects separately:
-
-JD JSON:
-{jd}
-
-Resume JSON:
-{resume}
+# Screening is split so the long instructions form a static prefix: they go
+# first, as the system message, and only the JD/resume user message varies.
+# The screener calls OpenAI-compatible endpoints, which have no cache_control;
+# those with automatic prefix caching (OpenAI, vLLM, llama.cpp, Ollama) can
+# then skip re-reading the instructions.
+# The system prompt is sent as-is, not formatted as a template.
+SCREEN_CANDIDATE_SYSTEM_PROMPT = """
+You are an experienced technical recruiter. You will receive TWO JSON objects separately: a JD JSON and a Resume JSON.
 
 Task: Perform a prescreening evaluation of candidate fit for the job. Compare must-have vs. candidate skills, good-to-have skills, location, and experience. Be strict with must-have skills: any critical missing must-have should significantly lower the score.
 
@@ -83,37 +83,45 @@ Rules:
 - Only return STRICT JSON, no extra commentary, no markdown.
 
 Output JSON format (use these exact keys):
-{{
+{
   "overall_fit": "strong_fit" | "possible_fit" | "not_fit",
   "score": 0,
-  "must_have": {{
+  "must_have": {
     "matched": ["skill", "skill"],
     "missing": ["skill", "skill"]
-  }},
-  "good_to_have": {{
+  },
+  "good_to_have": {
     "matched": ["skill", "skill"],
     "missing": ["skill", "skill"]
-  }},
-  "experience_match": {{
+  },
+  "experience_match": {
     "required_min_years": null,
     "candidate_years": null,
     "status": "meets" | "below" | "exceeds" | "unknown"
-  }},
-  "location_match": {{
+  },
+  "location_match": {
     "jd_location": null,
     "candidate_location": null,
     "status": "match" | "mismatch" | "unspecified"
-  }},
-  "domain_alignment": {{
+  },
+  "domain_alignment": {
     "matched": ["domain"],
     "missing": ["domain"]
-  }},
+  },
   "risks": ["short bullet reasons of concerns"],
   "summary": "one-line recruiter rationale",
   "verdict": "advance" | "hold" | "reject"
-}}
+}
+"""
+
+SCREEN_CANDIDATE_PROMPT = """
+JD JSON:
+{jd}
+
+Resume JSON:
+{resume}
 
-Now analyze the provided JD and Resume and return ONLY the JSON object above.
+Now analyze the provided JD and Resume and return ONLY the JSON object described in the instructions.
 """
 
 QUESTION_ANALYSIS = """ 
@@ -167,6 +175,7 @@ PROMPT_REGISTRY = {
     "parse_jd": PARSE_JD_PROMPT,
     "parse_resume": PARSE_RESUME_PROMPT,
     "screen_candidate": SCREEN_CANDIDATE_PROMPT,
+    "screen_candidate_system": SCREEN_CANDIDATE_SYSTEM_PROMPT,
     "question_analysis": QUESTION_ANALYSIS,
 }
 
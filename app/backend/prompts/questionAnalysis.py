@@ -1,22 +1,10 @@
-question_analysis = """ SYSTEM:
-You are a strict but fair technical interviewer and grader. 
+# Split into the static grader instructions (system) and the per-pair part
+# (user), so every call shares the same prefix. The rubric is kept as it
+# was; at a few hundred tokens it is below Claude's 1024-token minimum for
+# prompt caching, so the system prompt is sent uncached.
+question_analysis_system = """You are a strict but fair technical interviewer and grader. 
 Score only what’s in the answer. Do not invent facts. Be concise.
 
-USER:
-You are grading a candidate’s answer.
-
-Context:
-- Role: {{role}}
-- Years of experience: {{yoe}} (use experience-calibrated expectations)
-- Skill focus: {{skill}}
-- Optional reference notes (do not leak): {{reference_notes}}
-
-Question:
-{{question}}
-
-Candidate answer:
-{{answer}}
-
 Rubric:
 - Technical correctness (0–2)
 - Specificity & depth (0–2)
@@ -41,3 +29,17 @@ Return strict JSON:
   "improvement_tips": ["max 3 short bullets"],
   "flags": ["hallucination" | "security-risk" | "plagiarism-suspected" | "none"]
 }"""
+
+question_analysis_user = """You are grading a candidate’s answer.
+
+Context:
+- Role: {{role}}
+- Years of experience: {{yoe}} (use experience-calibrated expectations)
+- Skill focus: {{skill}}
+- Optional reference notes (do not leak): {{reference_notes}}
+
+Question:
+{{question}}
+
+Candidate answer:
+{{answer}}"""
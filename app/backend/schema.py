@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
 
@@ -81,6 +81,40 @@ class JobResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class JobListItem(BaseModel):
+    # GET /jobs supports sparse field selection, so everything but the id is optional
+    job_id: int
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    experience: Optional[str] = None
+    job_overview: Optional[str] = None
+    key_responsibilities: Optional[str] = None
+    must_have_skills: Optional[str] = None
+    good_to_have_skills: Optional[str] = None
+    recruiter_id: Optional[int] = None
+    job_type: Optional[str] = None
+    recruiter_name: Optional[str] = None
+    applications_count: Optional[int] = None
+    posted_date: Optional[datetime] = None
+
+class SkillMatchRequest(BaseModel):
+    # Same skill lists as ResumeData, so a parsed resume can be posted as is
+    primary_skills: List[str]
+    secondary_skills: List[str] = []
+    limit: int = Field(20, ge=1, le=100)
+
+class JobSkillMatch(BaseModel):
+    job_id: int
+    title: str
+    company: str
+    location: str
+    job_type: str
+    score: float
+    must_have_matched: int
+    must_have_total: int
+    good_to_have_matched: int
+
 class JobApplicationCreate(BaseModel):
     job_id: int
     first_name: str
@@ -104,11 +138,25 @@ class JobApplicationResponse(BaseModel):
     current_city: str
     gender: Gender
     resume_path: str
+    parse_task_id: Optional[int] = None
     message: str
 
     class Config:
         from_attributes = True
 
+class TaskResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    payload: dict
+    result: Optional[dict] = None
+    last_error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+
 class QuestionCreate(BaseModel):
     text: str
     tags: Optional[str] = None
@@ -171,6 +219,17 @@ class QuestionScoreResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class QuestionScoreBatchItem(BaseModel):
+    question_id: int
+    score: Optional[int] = None
+    verdict: Optional[str] = None
+    message: str
+
+class QuestionScoreBatchResponse(BaseModel):
+    results: List[QuestionScoreBatchItem]
+    db_ms: Optional[float] = None
+    llm_ms: Optional[float] = None
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
@@ -211,12 +270,24 @@ class InterviewSession(BaseModel):
     current_question_index: int
     questions: List[str]
     question_responses: List[QuestionResponse]
-    status: str  # "active", "completed", "ended"
+    status: str  # "active", "generating" (answer stored, follow-up being written), "completed", "ended"
     created_at: datetime
+    # Speculative follow-ups for the last queued question (see service.question_prefetch):
+    # {"question_index": int, "candidates": {"end_interview": bool, "clarify": str, ...}}
+    prefetched_followups: Optional[Dict] = None
+    # Grading notes for the initial questions, by position in questions:
+    # [{"reference_notes": str, "skill_tags": [str]}, ...]; follow-ups have none
+    question_notes: List[Dict] = []
+    # LLM spend attributed to the session, by call site (see service.llm_telemetry):
+    # {"interview.followup": {"calls": int, "input_tokens": int, ..., "cost_usd": float}}
+    llm_usage: Dict[str, Dict] = {}
 
 class StartInterviewRequest(BaseModel):
-    resume_data: ResumeData
-    jd_data: JobDescriptionData
+    # Either pass application_id to use the stored resume parse and job,
+    # or pass resume_data and jd_data directly
+    application_id: Optional[int] = None
+    resume_data: Optional[ResumeData] = None
+    jd_data: Optional[JobDescriptionData] = None
 
 class StartInterviewResponse(BaseModel):
     session_id: str
@@ -1,11 +1,19 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import database, models, schema
 
@@ -13,16 +21,66 @@ SECRET_KEY = "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated users are cached per process for this long (seconds); 0 disables
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "10000"))
+
+# bcrypt cost factor; stored hashes with a different cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads for bcrypt work; bcrypt releases the GIL, so this bounds CPU use per process
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Bounded pool so a login spike queues hashing work instead of stalling the
+# event loop or fanning out over every threadpool thread
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="password-hash"
+)
+
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _hash_executor.submit(pwd_context.verify, plain_password, hashed_password).result()
 
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return _hash_executor.submit(pwd_context.hash, password).result()
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; returns (valid, new_hash or None)
+
+    new_hash is set when the stored hash uses an outdated scheme or cost and
+    should be saved. With no stored hash a dummy verification still runs, so
+    unknown emails take as long as wrong passwords.
+    """
+    loop = asyncio.get_running_loop()
+    if hashed_password is None:
+        await loop.run_in_executor(_hash_executor, pwd_context.dummy_verify)
+        return False, None
+    return await loop.run_in_executor(
+        _hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, pwd_context.hash, password
+    )
+
+
+def user_claims(user: models.User) -> dict:
+    """JWT claims for a user: subject plus id, role and name"""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": schema.UserRole(user.role).value,
+        "name": user.name,
+    }
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -31,13 +89,82 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the authenticated user, safe to cache across requests"""
+
+    id: int
+    email: str
+    name: str
+    role: schema.UserRole
+
+    @classmethod
+    def from_model(cls, user: models.User) -> "AuthenticatedUser":
+        return cls(id=user.id, email=user.email, name=user.name, role=schema.UserRole(user.role))
+
+
+class UserCache:
+    """Short-TTL LRU of authenticated users by email
+
+    Entries are dropped when a User row is updated or deleted through the ORM
+    in this process (see the mapper events below); other processes see the
+    change once the TTL expires. Bulk query().update() calls bypass the events.
+    """
+
+    def __init__(self, ttl_seconds: float = AUTH_USER_CACHE_TTL, max_entries: int = AUTH_USER_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return entry[1]
+
+    def set(self, user: AuthenticatedUser) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user.email] = (time.monotonic(), user)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: Optional[str]) -> None:
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.email)
+    # An email change must also drop the entry under the old address
+    for old_email in inspect(target).attrs.email.history.deleted or ():
+        user_cache.invalidate(old_email)
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,8 +179,17 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = user_cache.get(email)
     if user is None:
+        db_user = await db.scalar(select(models.User).where(models.User.email == email))
+        if db_user is None:
+            raise credentials_exception
+        user = AuthenticatedUser.from_model(db_user)
+        user_cache.set(user)
+
+    # Tokens carry id and role claims; reject tokens issued before a role
+    # change or for a re-created account instead of trusting stale claims
+    if payload.get("uid") not in (None, user.id) or payload.get("role") not in (None, user.role.value):
         raise credentials_exception
     return user
 
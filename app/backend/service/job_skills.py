@@ -0,0 +1,139 @@
+"""
+Normalized skill index for jobs.
+
+Job.must_have_skills / good_to_have_skills are free-form comma-separated
+text. On job creation they are split, normalized and stored one row per skill
+in job_skills, so skill search and resume-to-job ranking are indexed lookups
+instead of table scans.
+
+Backfill existing jobs with:
+    python -m app.backend.service.job_skills
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.backend import database, models
+
+# Relative weight of a match, by (job requirement, candidate skill tier)
+MUST_HAVE_PRIMARY = 3.0
+MUST_HAVE_SECONDARY = 2.0
+GOOD_TO_HAVE_PRIMARY = 1.0
+GOOD_TO_HAVE_SECONDARY = 0.5
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase and collapse whitespace so 'React JS ' and 'react js' match"""
+    return re.sub(r"\s+", " ", skill or "").strip().lower()
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """Normalized, de-duplicated skills in their original order"""
+    seen = []
+    for skill in skills or []:
+        normalized = normalize_skill(skill)
+        if normalized and normalized not in seen:
+            seen.append(normalized)
+    return seen
+
+
+def split_skills(value: Optional[str]) -> List[str]:
+    return normalize_skills((value or "").split(","))
+
+
+def index_job_skills(db: Session, job: models.Job) -> None:
+    """Replace the job_skills rows for a job from its skill text columns"""
+    must_have = split_skills(job.must_have_skills)
+    good_to_have = [s for s in split_skills(job.good_to_have_skills) if s not in must_have]
+    job.skills = [
+        models.JobSkill(skill=skill, is_must_have=True) for skill in must_have
+    ] + [
+        models.JobSkill(skill=skill, is_must_have=False) for skill in good_to_have
+    ]
+
+
+def jobs_with_skill(skill: str):
+    """Subquery of job_ids that list the given skill (for IN filters)"""
+    return select(models.JobSkill.job_id).where(
+        models.JobSkill.skill == normalize_skill(skill)
+    )
+
+
+def rank_jobs_by_skills(
+    db: Session,
+    primary_skills: Iterable[str],
+    secondary_skills: Iterable[str] = (),
+    limit: int = 20,
+):
+    """Jobs ranked by weighted overlap with a candidate's skills, in one query"""
+    primary = normalize_skills(primary_skills)
+    secondary = [s for s in normalize_skills(secondary_skills) if s not in primary]
+    if not primary and not secondary:
+        return []
+
+    weight = case(
+        (
+            models.JobSkill.is_must_have & models.JobSkill.skill.in_(primary),
+            MUST_HAVE_PRIMARY,
+        ),
+        (models.JobSkill.is_must_have, MUST_HAVE_SECONDARY),
+        (models.JobSkill.skill.in_(primary), GOOD_TO_HAVE_PRIMARY),
+        else_=GOOD_TO_HAVE_SECONDARY,
+    )
+    must_have_total = (
+        select(func.count(models.JobSkill.id))
+        .where(
+            models.JobSkill.job_id == models.Job.job_id,
+            models.JobSkill.is_must_have.is_(True),
+        )
+        .correlate(models.Job)
+        .scalar_subquery()
+    )
+    matches = (
+        select(
+            models.JobSkill.job_id.label("job_id"),
+            func.sum(weight).label("score"),
+            func.sum(case((models.JobSkill.is_must_have, 1), else_=0)).label("must_have_matched"),
+            func.sum(case((models.JobSkill.is_must_have, 0), else_=1)).label("good_to_have_matched"),
+        )
+        .where(models.JobSkill.skill.in_(primary + secondary))
+        .group_by(models.JobSkill.job_id)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            models.Job.job_id,
+            models.Job.title,
+            models.Job.company,
+            models.Job.location,
+            models.Job.job_type,
+            matches.c.score,
+            matches.c.must_have_matched,
+            must_have_total.label("must_have_total"),
+            matches.c.good_to_have_matched,
+        )
+        .join(matches, matches.c.job_id == models.Job.job_id)
+        .order_by(matches.c.score.desc(), models.Job.job_id.desc())
+        .limit(limit)
+    ).all()
+
+
+def backfill_job_skills(db: Session) -> int:
+    """Index every job that has no job_skills rows yet; returns the count"""
+    jobs = (
+        db.query(models.Job)
+        .filter(~models.Job.job_id.in_(select(models.JobSkill.job_id)))
+        .all()
+    )
+    for job in jobs:
+        index_job_skills(db, job)
+    db.commit()
+    return len(jobs)
+
+
+if __name__ == "__main__":
+    with database.SessionLocal() as session:
+        print(f"Indexed skills for {backfill_job_skills(session)} jobs")
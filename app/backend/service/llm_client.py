@@ -0,0 +1,308 @@
+"""
+Shared async LLM client.
+
+Every LLM call site (interview generator, parser, screener, question analysis)
+goes through this module so requests never block the event loop and reuse one
+pooled HTTP connection per event loop.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.backend.service import llm_telemetry
+from app.backend.service.llm_health import ANTHROPIC, CHAT, health_monitor
+
+load_dotenv()
+
+ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_MODELS_URL = "https://api.anthropic.com/v1/models"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Connection pool sizing and default per-request timeout (seconds)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Transient failures (timeouts, connection errors, 408/409/429/5xx including
+# 529 overloaded) are retried with exponential backoff before giving up
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+
+
+class LLMError(Exception):
+    """Raised when an LLM provider call fails or returns a non-200 response"""
+
+
+# One pooled client per event loop; httpx async clients cannot be shared across loops
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled AsyncClient bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # Drop clients whose loop has gone away (e.g. earlier asyncio.run calls)
+        for stale_loop in [l for l in _clients if l.is_closed()]:
+            del _clients[stale_loop]
+        client = httpx.AsyncClient(
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close the client bound to the running event loop (call on shutdown)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def anthropic_headers(api_key: Optional[str] = None) -> Dict[str, str]:
+    """Build request headers for the Anthropic Messages API"""
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise LLMError("ANTHROPIC_API_KEY environment variable is required")
+    return {
+        "x-api-key": api_key,
+        "anthropic-version": ANTHROPIC_VERSION,
+        "content-type": "application/json",
+    }
+
+
+def _is_outage(status_code: int) -> bool:
+    """Responses that mean the provider is unusable, not that our request was bad"""
+    return status_code >= 500 or status_code in (401, 403, 429)
+
+
+def _record(provider: str, started: float, response: Optional[httpx.Response], error: Optional[str], source: str) -> None:
+    if response is not None and not _is_outage(response.status_code):
+        health_monitor.record_success(provider, (time.perf_counter() - started) * 1000, source=source)
+    else:
+        health_monitor.record_failure(provider, error or f"HTTP {response.status_code}", source=source)
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code in (408, 409, 429) or status_code >= 500
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Backoff before retry number attempt, honouring a short Retry-After"""
+    if response is not None:
+        try:
+            return min(float(response.headers["retry-after"]), 30.0)
+        except (KeyError, ValueError):
+            pass
+    return LLM_RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+async def _send(
+    provider: str,
+    label: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    timeout: Optional[float],
+    source: str,
+    call: Optional[llm_telemetry.LLMCall] = None,
+) -> httpx.Response:
+    """Send a request, retrying transient failures; returns the last response"""
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await send()
+        except httpx.TimeoutException:
+            error = f"{label} timed out after {timeout or LLM_TIMEOUT}s"
+            _record(provider, started, None, error, source)
+        except httpx.HTTPError as e:
+            error = f"{label} request failed: {e}"
+            _record(provider, started, None, error, source)
+        else:
+            ok = response.status_code == 200
+            _record(provider, started, response, None if ok else response.text[:500], source)
+            if ok or not _retryable(response.status_code):
+                return response
+        if attempt >= LLM_MAX_RETRIES:
+            if response is None:
+                raise LLMError(error)
+            return response
+        attempt += 1
+        if call is not None:
+            call.retry()
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+
+async def _anthropic_request(
+    method: str,
+    url: str,
+    api_key: Optional[str],
+    timeout: Optional[float],
+    source: str,
+    call: Optional[llm_telemetry.LLMCall] = None,
+    **kwargs,
+) -> httpx.Response:
+    headers = anthropic_headers(api_key)
+    response = await _send(
+        ANTHROPIC,
+        "Anthropic Claude API",
+        lambda: get_client().request(
+            method, url, headers=headers, timeout=timeout or LLM_TIMEOUT, **kwargs
+        ),
+        timeout,
+        source,
+        call,
+    )
+    if response.status_code != 200:
+        raise LLMError(f"Anthropic Claude API error: {response.text}")
+    return response
+
+
+async def anthropic_messages(
+    payload: Dict, api_key: Optional[str] = None, timeout: Optional[float] = None, site: str = "unknown"
+) -> Dict:
+    """POST a Messages API payload to Claude and return the response JSON
+
+    site names the calling feature for telemetry (see service.llm_telemetry).
+    """
+    with llm_telemetry.track_call(ANTHROPIC, payload.get("model"), site) as call:
+        response = await _anthropic_request(
+            "POST", ANTHROPIC_API_URL, api_key, timeout, "traffic", call, json=payload
+        )
+        response_json = response.json()
+        call.finish(response_json)
+    return response_json
+
+
+async def _iter_sse(response: httpx.Response) -> AsyncIterator[Tuple[str, Dict]]:
+    """(event, data) pairs from a server-sent events response body"""
+    event, data_lines = None, []
+    async for line in response.aiter_lines():
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+        elif not line and data_lines:
+            yield event or "message", json.loads("\n".join(data_lines))
+            event, data_lines = None, []
+
+
+async def _open_stream(client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+    response = await client.send(request, stream=True)
+    if response.status_code != 200:
+        # Error bodies are small; read them so they can be reported
+        await response.aread()
+        await response.aclose()
+    return response
+
+
+async def anthropic_stream(
+    payload: Dict, api_key: Optional[str] = None, timeout: Optional[float] = None, site: str = "unknown"
+) -> AsyncIterator[str]:
+    """Stream a Messages API call, yielding text deltas as Claude writes them
+
+    Closing the iterator early (e.g. the client went away) closes the
+    connection, which stops generation on Anthropic's side too. Failures
+    are only retried before the first byte arrives.
+    """
+    client = get_client()
+    request = client.build_request(
+        "POST",
+        ANTHROPIC_API_URL,
+        json={**payload, "stream": True},
+        headers=anthropic_headers(api_key),
+        timeout=timeout or LLM_TIMEOUT,
+    )
+    usage: Dict = {}
+    with llm_telemetry.track_call(ANTHROPIC, payload.get("model"), site) as call:
+        # Tokens are billed even if the client goes away mid-stream
+        call.partial_response = {"usage": usage}
+        # Time to first byte is the latency that matters for health
+        response = await _send(
+            ANTHROPIC, "Anthropic Claude API", lambda: _open_stream(client, request), timeout, "traffic", call
+        )
+        if response.status_code != 200:
+            raise LLMError(f"Anthropic Claude API error: {response.text}")
+        started = time.perf_counter()
+        try:
+            async for event, data in _iter_sse(response):
+                if event == "message_start":
+                    usage.update(data.get("message", {}).get("usage") or {})
+                elif event == "message_delta":
+                    usage.update(data.get("usage") or {})
+                elif event == "content_block_delta":
+                    delta = data.get("delta", {})
+                    if delta.get("type") == "text_delta":
+                        yield delta.get("text", "")
+                elif event == "error":
+                    raise LLMError(f"Anthropic Claude API stream error: {data.get('error', data)}")
+                elif event == "message_stop":
+                    break
+        except httpx.TimeoutException:
+            error = f"Anthropic Claude API timed out after {timeout or LLM_TIMEOUT}s"
+            _record(ANTHROPIC, started, None, error, "traffic")
+            raise LLMError(error)
+        except httpx.HTTPError as e:
+            error = f"Anthropic Claude API request failed: {e}"
+            _record(ANTHROPIC, started, None, error, "traffic")
+            raise LLMError(error)
+        finally:
+            await response.aclose()
+        call.finish({"usage": usage})
+
+
+async def anthropic_models(
+    api_key: Optional[str] = None, timeout: Optional[float] = 10, source: str = "traffic"
+) -> Dict:
+    """List available Claude models; free, so it doubles as a reachability probe"""
+    response = await _anthropic_request("GET", ANTHROPIC_MODELS_URL, api_key, timeout, source)
+    return response.json()
+
+
+def anthropic_text(response_json: Dict) -> str:
+    """Concatenate the text blocks of a Messages API response"""
+    text_content = ""
+    for block in response_json.get("content", []):
+        if block.get("type") == "text":
+            text_content += block.get("text", "")
+    return text_content
+
+
+async def chat_completion(
+    payload: Dict, api_url: str, api_key: str, timeout: Optional[float] = None, site: str = "unknown"
+) -> Dict:
+    """POST an OpenAI-compatible chat completion payload and return the response JSON
+
+    site names the calling feature for telemetry (see service.llm_telemetry).
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    with llm_telemetry.track_call(CHAT, payload.get("model"), site) as call:
+        response = await _send(
+            CHAT,
+            "API call",
+            lambda: get_client().post(
+                api_url, json=payload, headers=headers, timeout=timeout or LLM_TIMEOUT
+            ),
+            timeout,
+            "traffic",
+            call,
+        )
+        if response.status_code != 200:
+            raise LLMError(f"API call failed {response.status_code}: {response.text}")
+        response_json = response.json()
+        call.finish(response_json)
+    return response_json
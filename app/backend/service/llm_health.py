@@ -0,0 +1,157 @@
+"""
+Cached LLM and database health.
+
+Probe endpoints (/health, /health/ready, /claude/status) must be cheap: load
+balancers hit them every few seconds. Instead of sending a billed completion
+per probe, llm_client reports the outcome of every real call here, and a
+background monitor fills the gaps with non-billing probes (GET /v1/models for
+Claude, SELECT 1 for the database) when there has been no recent traffic.
+Endpoints only read the cached state.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Probe a dependency when nothing has reported on it for this long (seconds)
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "60"))
+# Consecutive failures before a dependency is reported as "error" instead of "degraded"
+HEALTH_FAILURE_THRESHOLD = int(os.getenv("HEALTH_FAILURE_THRESHOLD", "3"))
+# Whether /health/ready should fail while Claude is unreachable
+HEALTH_READY_REQUIRES_LLM = os.getenv("HEALTH_READY_REQUIRES_LLM", "false").lower() in ("1", "true", "yes")
+
+ANTHROPIC = "anthropic"
+CHAT = "chat_completion"
+DATABASE = "database"
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class HealthMonitor:
+    """Last known state of each dependency, updated by real calls and probes"""
+
+    def __init__(self, failure_threshold: int = HEALTH_FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self._state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name: str) -> Dict:
+        return self._state.setdefault(
+            name,
+            {
+                "last_success": None,
+                "last_failure": None,
+                "last_error": None,
+                "consecutive_failures": 0,
+                "latency_ms": None,
+                "source": None,
+            },
+        )
+
+    def record_success(self, name: str, latency_ms: Optional[float] = None, source: str = "traffic") -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry["last_success"] = time.time()
+            entry["consecutive_failures"] = 0
+            entry["latency_ms"] = round(latency_ms, 1) if latency_ms is not None else None
+            entry["source"] = source
+
+    def record_failure(self, name: str, error: str, source: str = "traffic") -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry["last_failure"] = time.time()
+            entry["last_error"] = error[:500]
+            entry["consecutive_failures"] += 1
+            entry["source"] = source
+
+    def last_seen(self, name: str) -> Optional[float]:
+        """Time of the most recent success or failure report, if any"""
+        with self._lock:
+            entry = self._state.get(name)
+            if entry is None:
+                return None
+            return max(entry["last_success"] or 0, entry["last_failure"] or 0) or None
+
+    def status(self, name: str) -> Dict:
+        """Cached status: connected, degraded, error or unknown"""
+        with self._lock:
+            entry = dict(self._state.get(name) or {})
+        if not entry or (entry["last_success"] is None and entry["last_failure"] is None):
+            return {"status": "unknown", "message": "No calls or probes recorded yet"}
+
+        failures = entry["consecutive_failures"]
+        if failures == 0:
+            status, message = "connected", "Last call succeeded"
+        elif failures < self.failure_threshold:
+            status, message = "degraded", f"{failures} recent call(s) failed"
+        else:
+            status, message = "error", f"{failures} consecutive calls failed"
+        return {
+            "status": status,
+            "message": message,
+            "last_success": _iso(entry["last_success"]),
+            "last_failure": _iso(entry["last_failure"]),
+            "last_error": entry["last_error"] if failures else None,
+            "consecutive_failures": failures,
+            "latency_ms": entry["latency_ms"],
+            "source": entry["source"],
+        }
+
+
+# Process-wide monitor fed by llm_client
+health_monitor = HealthMonitor()
+
+
+def _ping_database() -> None:
+    from sqlalchemy import text
+
+    from app.backend import database
+
+    with database.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def probe_database() -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_ping_database)
+    except Exception as e:
+        health_monitor.record_failure(DATABASE, str(e), source="probe")
+        return
+    health_monitor.record_success(DATABASE, (time.perf_counter() - started) * 1000, source="probe")
+
+
+async def probe_anthropic() -> None:
+    """Non-billing reachability check (lists models, no tokens used)"""
+    from app.backend.service import llm_client
+
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        return
+    try:
+        # anthropic_models reports its own outcome to the monitor
+        await llm_client.anthropic_models(source="probe")
+    except llm_client.LLMError:
+        pass
+
+
+async def monitor_loop(stop_event: asyncio.Event, interval: float = HEALTH_PROBE_INTERVAL) -> None:
+    """Probe dependencies that have not reported for `interval` seconds"""
+    while not stop_event.is_set():
+        stale_before = time.time() - interval
+        # Real traffic keeps the LLM state fresh; only probe when it has gone quiet
+        if (health_monitor.last_seen(ANTHROPIC) or 0) < stale_before:
+            await probe_anthropic()
+        await probe_database()
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,282 @@
+"""
+Per-call LLM telemetry: tokens, latency, retries and estimated cost.
+
+llm_client opens an LLMCall for every completion request and finishes it
+with the provider's usage block. Each finished call is recorded:
+
+- on /metrics, labelled by provider, model and call site (requests, latency
+  histogram, retries, tokens by kind, estimated cost in USD);
+- in a rolling latency window per (site, model), so usage_summary() can
+  report p50/p95/p99 without a Prometheus server;
+- in the active UsageCollector, if any, which request handlers use to add an
+  interview's LLM spend to its session (collect_usage()).
+
+Costs come from MODEL_PRICES (USD per million tokens), matched by model-name
+prefix and extendable with a JSON file named by LLM_PRICES_FILE. Models not
+in the table (e.g. self-hosted ones) are recorded with zero cost.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from app.backend import metrics
+
+load_dotenv()
+
+LLM_PRICES_FILE = os.getenv("LLM_PRICES_FILE")
+# Latencies kept per (site, model) for percentile summaries
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "1000"))
+
+# USD per million tokens; cache_write is the 5-minute prompt cache write price
+MODEL_PRICES: Dict[str, Dict[str, float]] = {
+    "claude-opus-4": {"input": 15.0, "output": 75.0, "cache_read": 1.5, "cache_write": 18.75},
+    "claude-sonnet-4": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-3-7-sonnet": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-3-5-sonnet": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-3-5-haiku": {"input": 0.8, "output": 4.0, "cache_read": 0.08, "cache_write": 1.0},
+    "claude-3-opus": {"input": 15.0, "output": 75.0, "cache_read": 1.5, "cache_write": 18.75},
+    "claude-3-haiku": {"input": 0.25, "output": 1.25, "cache_read": 0.03, "cache_write": 0.3},
+}
+
+if LLM_PRICES_FILE:
+    try:
+        with open(LLM_PRICES_FILE, "r", encoding="utf-8") as f:
+            MODEL_PRICES.update(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not load LLM prices from {LLM_PRICES_FILE}: {e}")
+
+TOKEN_KINDS = ("input", "output", "cache_read", "cache_write")
+
+llm_requests = metrics.counter(
+    "llm_requests_total", "LLM completion calls by outcome (ok, error, cancelled)",
+    ["provider", "model", "site", "outcome"],
+)
+llm_latency = metrics.histogram(
+    "llm_request_seconds", "Wall time of LLM completion calls, retries included",
+    ["provider", "model", "site"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0),
+)
+llm_retries = metrics.counter(
+    "llm_retries_total", "Retried LLM requests after transient failures", ["provider", "model", "site"]
+)
+llm_tokens = metrics.counter(
+    "llm_tokens_total",
+    "Tokens billed per LLM call: kind is input (uncached), output, cache_read or cache_write",
+    ["provider", "model", "site", "kind"],
+)
+llm_cost = metrics.counter(
+    "llm_cost_usd_total", "Estimated LLM spend from MODEL_PRICES", ["provider", "model", "site"]
+)
+
+
+def price_for(model: Optional[str]) -> Optional[Dict[str, float]]:
+    """Price entry for a model id, matched on the longest known prefix"""
+    if not model:
+        return None
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model: Optional[str], tokens: Dict[str, int]) -> float:
+    """Estimated USD cost of one call's token usage (0 for unpriced models)"""
+    price = price_for(model)
+    if price is None:
+        return 0.0
+    return sum(tokens.get(kind, 0) * price.get(kind, 0.0) for kind in TOKEN_KINDS) / 1_000_000
+
+
+def usage_tokens(response_json: Dict) -> Dict[str, int]:
+    """Token usage of an Anthropic or OpenAI-compatible response, in one shape
+
+    input counts uncached prompt tokens only, so the four kinds add up to
+    what was billed. OpenAI-compatible APIs report cached prompt tokens as
+    prompt_tokens_details.cached_tokens (or prompt_cache_hit_tokens) and
+    cache writes are not billed separately there.
+    """
+    usage = response_json.get("usage") or {}
+    if "input_tokens" in usage or "cache_read_input_tokens" in usage:
+        return {
+            "input": usage.get("input_tokens") or 0,
+            "output": usage.get("output_tokens") or 0,
+            "cache_read": usage.get("cache_read_input_tokens") or 0,
+            "cache_write": usage.get("cache_creation_input_tokens") or 0,
+        }
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or usage.get(
+        "prompt_cache_hit_tokens"
+    ) or 0
+    return {
+        "input": max((usage.get("prompt_tokens") or 0) - cached, 0),
+        "output": usage.get("completion_tokens") or 0,
+        "cache_read": cached,
+        "cache_write": 0,
+    }
+
+
+def _empty_totals() -> Dict[str, float]:
+    totals = {"calls": 0, "errors": 0, "retries": 0, "latency_seconds": 0.0, "cost_usd": 0.0}
+    totals.update({f"{kind}_tokens": 0 for kind in TOKEN_KINDS})
+    return totals
+
+
+def add_totals(totals: Dict[str, float], other: Dict[str, float]) -> Dict[str, float]:
+    """Sum two per-site totals dicts into the first"""
+    for key, value in other.items():
+        totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _record_totals(record: Dict) -> Dict[str, float]:
+    return {
+        "calls": 1,
+        "errors": 0 if record["outcome"] == "ok" else 1,
+        "retries": record["retries"],
+        "latency_seconds": record["seconds"],
+        "cost_usd": record["cost_usd"],
+        **{f"{kind}_tokens": record["tokens"][kind] for kind in TOKEN_KINDS},
+    }
+
+
+class UsageCollector:
+    """Per-site totals of the LLM calls finished while it is active"""
+
+    def __init__(self):
+        self.by_site: Dict[str, Dict[str, float]] = {}
+
+    def add(self, record: Dict) -> None:
+        add_totals(self.by_site.setdefault(record["site"], _empty_totals()), _record_totals(record))
+
+
+_collector: ContextVar[Optional[UsageCollector]] = ContextVar("llm_usage_collector", default=None)
+
+
+@contextmanager
+def collect_usage() -> Iterator[UsageCollector]:
+    """Collect the LLM calls finished in this context (copied into tasks created inside it)"""
+    collector = UsageCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        try:
+            _collector.reset(token)
+        except ValueError:
+            # Closed from another context (an abandoned streaming response's
+            # generator), where the collector was never set
+            pass
+
+
+# (site, model) -> totals and recent latencies, for usage_summary()
+_summary: Dict[tuple, Dict] = {}
+_summary_lock = threading.Lock()
+
+
+class LLMCall:
+    """One logical LLM request (all its retries), finished exactly once"""
+
+    def __init__(self, provider: str, model: Optional[str], site: str):
+        self.provider = provider
+        self.model = model or "unknown"
+        self.site = site
+        self.retries = 0
+        self.started = time.perf_counter()
+        # Usage seen so far, for calls that end before a final response (streams)
+        self.partial_response: Optional[Dict] = None
+        self._finished = False
+
+    def retry(self) -> None:
+        self.retries += 1
+        llm_retries.inc(provider=self.provider, model=self.model, site=self.site)
+
+    def finish(self, response_json: Optional[Dict] = None, outcome: str = "ok") -> Optional[Dict]:
+        """Record the call; response_json supplies the usage block (and model, if unset)"""
+        if self._finished:
+            return None
+        self._finished = True
+        response_json = response_json or self.partial_response or {}
+        if self.model == "unknown" and response_json.get("model"):
+            self.model = response_json["model"]
+        seconds = time.perf_counter() - self.started
+        tokens = usage_tokens(response_json)
+        record = {
+            "provider": self.provider,
+            "model": self.model,
+            "site": self.site,
+            "outcome": outcome,
+            "retries": self.retries,
+            "seconds": seconds,
+            "tokens": tokens,
+            "cost_usd": estimate_cost(self.model, tokens),
+        }
+
+        labels = {"provider": self.provider, "model": self.model, "site": self.site}
+        llm_requests.inc(outcome=outcome, **labels)
+        llm_latency.observe(seconds, **labels)
+        for kind, count in tokens.items():
+            if count:
+                llm_tokens.inc(count, kind=kind, **labels)
+        if record["cost_usd"]:
+            llm_cost.inc(record["cost_usd"], **labels)
+
+        with _summary_lock:
+            entry = _summary.setdefault(
+                (self.site, self.model),
+                {"totals": _empty_totals(), "latencies": deque(maxlen=LLM_LATENCY_WINDOW)},
+            )
+            add_totals(entry["totals"], _record_totals(record))
+            entry["latencies"].append(seconds)
+
+        collector = _collector.get()
+        if collector is not None:
+            collector.add(record)
+        return record
+
+
+@contextmanager
+def track_call(provider: str, model: Optional[str], site: str) -> Iterator[LLMCall]:
+    """An LLMCall for the block; finish it with the response, or it is recorded as failed"""
+    call = LLMCall(provider, model, site)
+    try:
+        yield call
+    except (asyncio.CancelledError, GeneratorExit):
+        call.finish(outcome="cancelled")
+        raise
+    except BaseException:
+        call.finish(outcome="error")
+        raise
+    finally:
+        call.finish()
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def usage_summary() -> list:
+    """Per (site, model) totals and latency percentiles, most expensive first"""
+    with _summary_lock:
+        entries = [
+            (site, model, dict(entry["totals"]), sorted(entry["latencies"]))
+            for (site, model), entry in _summary.items()
+        ]
+    rows = []
+    for site, model, totals, latencies in entries:
+        row = {"site": site, "model": model, **totals}
+        row["cost_usd"] = round(row["cost_usd"], 6)
+        row["latency_seconds"] = round(row["latency_seconds"], 3)
+        if latencies:
+            row.update({
+                f"p{int(q * 100)}_seconds": round(_percentile(latencies, q), 3)
+                for q in (0.5, 0.95, 0.99)
+            })
+        rows.append(row)
+    return sorted(rows, key=lambda row: (row["cost_usd"], row["latency_seconds"]), reverse=True)
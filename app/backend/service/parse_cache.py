@@ -0,0 +1,209 @@
+"""
+Content-addressed cache for LLM parse results.
+
+parse_with_ai results are keyed by a hash of the extracted text, the prompt
+template and the model, so parsing the same resume or JD again (re-screening
+against another job, re-parsing after a deploy) never reaches the LLM.
+
+Two tiers: an in-memory LRU in front of a JSON-file store on disk. Both tiers
+apply the same TTL; the disk tier is trimmed oldest-first when it grows past
+its entry limit. get/set are coroutines: disk reads and writes run in worker
+threads and trimming runs on a background thread, so the event loop only
+ever waits on the memory tier.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", ".cache/parse")
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "512"))
+PARSE_CACHE_MAX_DISK_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_DISK_ENTRIES", "50000"))
+PARSE_CACHE_TTL_SECONDS = int(os.getenv("PARSE_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60)))
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(text: str, prompt_template: str, model: Optional[str]) -> str:
+    """Cache key for one (text, prompt template, model) combination"""
+    digest = hashlib.sha256()
+    for part in (content_hash(text), content_hash(prompt_template), model or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Two-tier (memory LRU + disk) TTL cache of parsed JSON results"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = PARSE_CACHE_DIR,
+        max_entries: int = PARSE_CACHE_MAX_ENTRIES,
+        max_disk_entries: int = PARSE_CACHE_MAX_DISK_ENTRIES,
+        ttl_seconds: int = PARSE_CACHE_TTL_SECONDS,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._trim_thread: Optional[threading.Thread] = None
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: Dict) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Touch on read so disk trimming is least-recently-used
+            os.utime(path)
+            return stored_at, value
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, value: Dict) -> None:
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Parse cache write failed: {e}")
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return the cached value or None, updating hit/miss counters"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                # Callers may mutate results; never hand out the cached object
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self._memory[key]
+
+        disk_entry = await asyncio.to_thread(self._read_disk, key) if self.directory else None
+
+        with self._lock:
+            if disk_entry:
+                self._remember(key, *disk_entry)
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return copy.deepcopy(disk_entry[1])
+            self._counters["misses"] += 1
+            return None
+
+    async def set(self, key: str, value: Dict) -> None:
+        """Store a value in both tiers"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, time.time(), value)
+            self._counters["writes"] += 1
+            # Trim the disk tier only now and then; listing it is not free
+            trim = self._counters["writes"] % 100 == 0
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, value)
+            if trim:
+                self._start_trim()
+
+    def _start_trim(self) -> None:
+        """Trim the disk tier on a background thread, unless a trim is running"""
+        with self._lock:
+            if self._trim_thread is not None and self._trim_thread.is_alive():
+                return
+            self._trim_thread = threading.Thread(
+                target=self._trim_disk, name="parse-cache-trim", daemon=True
+            )
+            self._trim_thread.start()
+
+    def _trim_disk(self) -> None:
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        entries.sort()
+        excess = len(entries) - self.max_disk_entries
+        removed = 0
+        for index, (mtime, path) in enumerate(entries):
+            if index < excess or self._expired(mtime):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._counters["evictions"] += removed
+
+    def stats(self) -> Dict:
+        """Hit/miss counters plus current memory tier size"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self) -> None:
+        """Drop the memory tier (disk entries expire on their own)"""
+        with self._lock:
+            self._memory.clear()
+
+
+# Process-wide cache used by parse_with_ai
+parse_cache = ParseCache()
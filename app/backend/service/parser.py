@@ -1,8 +1,12 @@
+import asyncio
 import json
+import multiprocessing
 import os
 import re
-import requests
-from typing import Dict, Union
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from langchain_core.prompts import ChatPromptTemplate
 # Optional PDF backends: PyMuPDF ('fitz') and fallback 'pypdf'
 try:
@@ -22,21 +26,36 @@ except Exception:
 import docx2txt  # For DOCX
 from dotenv import load_dotenv
 
+from app.backend.service import llm_client
+from app.backend.service.parse_cache import PARSE_CACHE_ENABLED, make_key, parse_cache
+
 
 load_dotenv()
 API_URL = os.getenv("API_URL")
 API_KEY = os.getenv("API_KEY")
 LLM_MODEL = os.getenv("LLM_MODEL")
 
+# PDF extraction limits: pages past PDF_MAX_PAGES and text past PDF_MAX_CHARS
+# are never extracted (0 disables a limit). Documents with at least
+# PDF_PARALLEL_MIN_PAGES pages are split across PDF_WORKERS processes.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30")) or None
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "60000")) or None
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 
 
-def parse_with_ai(text: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
+async def parse_with_ai(
+    text: str, prompt: Union[str, ChatPromptTemplate], use_cache: bool = PARSE_CACHE_ENABLED
+) -> Dict:
     """Send text to a remote AI API and return the parsed JSON.
 
     Parameters:
     - text: The input text to parse (e.g., job description, resume, etc.).
     - prompt: Prompt to control the LLM behavior. Can be a raw string template
       with {text} placeholder or a ChatPromptTemplate. This argument is required.
+    - use_cache: Serve/store results in the content-addressed parse cache,
+      keyed by text, prompt template and model. Errors are never cached.
     """
 
     # Resolve the effective prompt template
@@ -45,6 +64,13 @@ def parse_with_ai(text: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
     else:
         effective_prompt = ChatPromptTemplate.from_template(prompt)
 
+    cache_key = None
+    if use_cache:
+        cache_key = make_key(text, effective_prompt.format(text="{text}"), LLM_MODEL)
+        cached = await parse_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     if not (API_URL and API_KEY):
         return {"error": "Remote AI API not configured"}
 
@@ -56,17 +82,12 @@ def parse_with_ai(text: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
         ]
     }
 
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    response = requests.post(API_URL, headers=headers, json=payload)
-
-    if response.status_code != 200:
-        return {"error": f"API call failed {response.status_code}: {response.text}"}
+    try:
+        response_json = await llm_client.chat_completion(payload, API_URL, API_KEY, site="parser.parse")
+    except llm_client.LLMError as e:
+        return {"error": str(e)}
 
     try:
-        response_json = response.json()
         response_text = response_json["choices"][0]["message"]["content"].strip()
     except Exception as e:
         return {"error": f"Bad response format: {str(e)}"}
@@ -90,55 +111,151 @@ def parse_with_ai(text: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
         print("AI JSON decode failed after cleanup", data[:500], flush=True)
         return {"error": "Failed to parse AI response as JSON"}
 
+    if cache_key and isinstance(raw_json, dict) and "error" not in raw_json:
+        await parse_cache.set(cache_key, raw_json)
+
     return raw_json
 
 
-def read_pdf(file_path: str) -> str:
-    """Read text from a PDF using the best available backend.
+def _pymupdf_page_text(page) -> str:
+    # 'text' mode gives layout-aware text; fallback to default if needed
+    return page.get_text("text") or page.get_text() or ""
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) with PyMuPDF; runs in pool worker processes"""
+    with fitz.open(file_path) as pdf:
+        return [_pymupdf_page_text(pdf[index]) for index in range(start, min(stop, pdf.page_count))]
+
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+# Extraction runs in worker threads (asyncio.to_thread), which share the pool
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn: the parent runs threads (event loop, executors), fork is unsafe
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next large PDF starts a fresh one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_page_ranges(file_path: str, starts: range, chunk: int):
+    """(pool, futures) for the page chunks; futures is None if the pool is broken"""
+    pool = _get_pdf_pool()
+    futures = []
+    try:
+        for start in starts:
+            futures.append(pool.submit(_extract_page_range, file_path, start, start + chunk))
+    except BrokenProcessPool:
+        for future in futures:
+            future.cancel()
+        _discard_pdf_pool(pool)
+        return pool, None
+    return pool, futures
+
+
+def _iter_pymupdf_pages(file_path: str, max_pages: Optional[int]) -> Iterator[str]:
+    with fitz.open(file_path) as pdf:
+        page_count = pdf.page_count if max_pages is None else min(pdf.page_count, max_pages)
+        if PDF_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+            # Large documents: pages are extracted in chunks across processes
+            # and yielded in order; chunks not reached are cancelled
+            chunk = max(1, -(-page_count // (PDF_WORKERS * 2)))
+            starts = range(0, page_count, chunk)
+            pool, futures = _submit_page_ranges(file_path, starts, chunk)
+            try:
+                for index, start in enumerate(starts):
+                    pages = None
+                    if futures is not None:
+                        try:
+                            pages = futures[index].result()
+                        except BrokenProcessPool:
+                            # Pool unusable (e.g. worker killed): replace it for
+                            # later documents and finish this one in-process
+                            _discard_pdf_pool(pool)
+                            futures = None
+                    if pages is None:
+                        pages = [_pymupdf_page_text(pdf[i]) for i in range(start, min(start + chunk, page_count))]
+                    yield from pages
+            finally:
+                for future in futures or []:
+                    future.cancel()
+            return
+        for index in range(page_count):
+            yield _pymupdf_page_text(pdf[index])
+
+
+def _iter_pypdf_pages(file_path: str, max_pages: Optional[int], errors: List[str]) -> Iterator[str]:
+    reader = PdfReader(file_path)  # type: ignore[name-defined]
+    for index, page in enumerate(reader.pages):
+        if max_pages is not None and index >= max_pages:
+            return
+        try:
+            yield page.extract_text() or ""
+        except Exception as e:
+            errors.append(f"pypdf page extract error: {e}")
+            yield ""
+
+
+def iter_pdf_pages(file_path: str, max_pages: Optional[int] = PDF_MAX_PAGES) -> Iterator[str]:
+    """Yield the text of each PDF page, in order, using the best available backend.
 
     Order of preference:
-    1) PyMuPDF (fitz) — fast and robust
-    2) pypdf — pure-Python fallback
+    1) PyMuPDF (fitz) — fast and robust; large files are split across a process pool
+    2) pypdf — pure-Python fallback, only used when PyMuPDF cannot open the file
+
+    Pages are produced lazily, so a consumer that stops early (see
+    iter_pdf_text) never extracts the rest of the document.
 
     Raises:
         ImportError: if no PDF backend is available
-        ValueError: if extraction yields empty text (likely a scanned PDF) or both backends failed
+        ValueError: if extraction yields no text (likely a scanned PDF) or both backends failed
     """
     errors: list[str] = []
+    found_text = False
+    pymupdf_read = False
 
-    # Try PyMuPDF first if available
     if _HAVE_PYMUPDF:
         try:
-            text = ""
-            with fitz.open(file_path) as pdf:
-                for page in pdf:
-                    # 'text' mode gives layout-aware text; fallback to default if needed
-                    page_text = page.get_text("text") or page.get_text() or ""
-                    if page_text:
-                        text += page_text + "\n"
-            if text.strip():
-                return text.strip()
+            for page_text in _iter_pymupdf_pages(file_path, max_pages):
+                found_text = found_text or bool(page_text.strip())
+                yield page_text
+            pymupdf_read = True
         except Exception as e:
+            if found_text:
+                raise
             errors.append(f"PyMuPDF failed: {e}")
+        if found_text:
+            return
+        if pymupdf_read:
+            # Readable but textless (scanned): pypdf would not find text either
+            errors.append("PyMuPDF found no text")
 
-    # Fallback to pypdf if available
-    if _HAVE_PYPDF:
+    if _HAVE_PYPDF and not pymupdf_read:
         try:
-            parts: list[str] = []
-            reader = PdfReader(file_path)  # type: ignore[name-defined]
-            for page in reader.pages:
-                try:
-                    t = page.extract_text() or ""
-                except Exception as e2:
-                    t = ""
-                    errors.append(f"pypdf page extract error: {e2}")
-                if t:
-                    parts.append(t)
-            combined = "\n".join(parts).strip()
-            if combined:
-                return combined
+            for page_text in _iter_pypdf_pages(file_path, max_pages, errors):
+                found_text = found_text or bool(page_text.strip())
+                yield page_text
         except Exception as e:
+            if found_text:
+                raise
             errors.append(f"pypdf failed: {e}")
+        if found_text:
+            return
 
     # No backends? Instruct how to install
     if not _HAVE_PYMUPDF and not _HAVE_PYPDF:
@@ -153,6 +270,36 @@ def read_pdf(file_path: str) -> str:
         "Consider OCR (e.g., pytesseract) if needed. " + error_note
     )
 
+
+def iter_capped_text(pages: Iterable[str], max_chars: Optional[int] = PDF_MAX_CHARS) -> Iterator[str]:
+    """Pass through non-empty page texts until max_chars, closing the source early"""
+    remaining = max_chars
+    try:
+        for page_text in pages:
+            page_text = page_text.strip()
+            if not page_text:
+                continue
+            if remaining is not None:
+                page_text = page_text[:remaining]
+                remaining -= len(page_text) + 1
+            yield page_text
+            if remaining is not None and remaining <= 0:
+                return
+    finally:
+        # Stop the page generator so it cancels pending pool work
+        close = getattr(pages, "close", None)
+        if close:
+            close()
+
+
+def read_pdf(
+    file_path: str,
+    max_pages: Optional[int] = PDF_MAX_PAGES,
+    max_chars: Optional[int] = PDF_MAX_CHARS,
+) -> str:
+    """Read text from a PDF, stopping after max_pages pages or max_chars characters"""
+    return "\n".join(iter_capped_text(iter_pdf_pages(file_path, max_pages), max_chars))
+
 def read_docx(file_path: str) -> str:
     return docx2txt.process(file_path).strip()
 
@@ -160,24 +307,39 @@ def read_txt(file_path: str) -> str:
     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read().strip()
 
-def get_text_from_file(path_str: str) -> str:
-
+def iter_text_from_file(path_str: str) -> Iterator[str]:
+    """Yield a file's text in pieces (one per PDF page) as it is extracted"""
     extension = os.path.splitext(path_str)[-1].lower()
 
     if extension == ".pdf":
-        return read_pdf(path_str)
+        yield from iter_capped_text(iter_pdf_pages(path_str))
     elif extension == ".docx":
-        return read_docx(path_str)
+        yield read_docx(path_str)
     elif extension == ".txt":
-        return read_txt(path_str)
+        yield read_txt(path_str)
     else:
         raise ValueError(f"Unsupported file type: {extension}")
 
 
-def parse_file_with_ai(path_str: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
+def get_text_from_file(path_str: str) -> str:
+    return "\n".join(iter_text_from_file(path_str))
+
+
+def get_text_from_storage(key: str) -> str:
+    """Text of a stored blob (e.g. JobApplication.resume_path) on any worker"""
+    from app.backend.service.storage import get_storage
+
+    with get_storage().local_copy(key) as path:
+        return get_text_from_file(path)
+
+
+async def parse_file_with_ai(path_str: str, prompt: Union[str, ChatPromptTemplate]) -> Dict:
     """Convenience helper: read a file and parse its contents with the AI.
-    Supports PDF, DOCX, and TXT via get_text_from_file.
+    Supports PDF, DOCX, and TXT via get_text_from_file. PDF text is extracted
+    page by page up to the page/char caps and joined before the single
+    parse_with_ai call.
     """
-    text = get_text_from_file(path_str)
-    return parse_with_ai(text, prompt)
+    # Text extraction is blocking (PDF/DOCX parsing), keep it off the event loop
+    text = await asyncio.to_thread(get_text_from_file, path_str)
+    return await parse_with_ai(text, prompt)
 
@@ -1,107 +1,126 @@
+import asyncio
 import json
 import os
 
-import requests
+from app.backend.prompts.questionAnalysis import (question_analysis_system,
+                                                  question_analysis_user)
+from app.backend.service import llm_client
+
+# Upper bound on concurrent Claude calls for one batch, and per-call timeout (seconds)
+SCORING_MAX_WORKERS = int(os.getenv("SCORING_MAX_WORKERS", "6"))
+SCORING_TIMEOUT = float(os.getenv("SCORING_TIMEOUT", "60"))
 
 
 class QuestionAnalysisService:
     """Service for analyzing and scoring candidate question responses"""
 
-    def __init__(self):
+    def __init__(self, max_workers=SCORING_MAX_WORKERS, timeout=SCORING_TIMEOUT):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
         self.model = "claude-3-7-sonnet-20250219"
-        self.api_url = "https://api.anthropic.com/v1/messages"
-        self.headers = {
-            "x-api-key": self.anthropic_api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        }
-        # Load the question analysis prompt
-        prompt_path = os.path.join(
-            os.path.dirname(__file__), "../prompts/questionAnalysis.py"
-        )
-        with open(prompt_path, "r") as f:
-            self.prompt_template = f.read()
+        # Static rubric sent as the system prompt; only the user part varies
+        self.system_prompt = question_analysis_system
+        self.prompt_template = question_analysis_user
 
     def _validate_api_key(self):
         """Validate that the Anthropic API key is set"""
         if not self.anthropic_api_key:
             raise ValueError("Anthropic API key not set")
 
-    def analyze_questions(
+    async def analyze_questions(
         self, qa_pairs, role="Software Engineer", yoe=3, skill="Python"
     ):
         """
         Analyze and score candidate responses to questions
 
         Args:
-            qa_pairs: List of dictionaries containing question_id, question, and answer
+            qa_pairs: List of dictionaries containing question_id, question, and answer,
+                optionally with reference_notes and skill (overrides skill for that pair)
             role: The role the candidate is applying for
             yoe: Years of experience
             skill: Primary skill being evaluated
 
         Returns:
-            List of dictionaries containing question_id and score details
+            List of dictionaries containing question_id and score details, in
+            the same order as qa_pairs. A pair that failed to score is
+            returned as {"question_id": ..., "error": "..."} instead.
         """
         self._validate_api_key()
 
-        results = []
-
-        # Process each QA pair
-        for qa_pair in qa_pairs:
-            question_id = qa_pair["question_id"]
-            question = qa_pair["question"]
-            answer = qa_pair["answer"]
-
-            # Format the prompt with the current question and answer
-            formatted_prompt = self.prompt_template.replace("{{role}}", role)
-            formatted_prompt = formatted_prompt.replace("{{yoe}}", str(yoe))
-            formatted_prompt = formatted_prompt.replace("{{skill}}", skill)
-            formatted_prompt = formatted_prompt.replace("{{reference_notes}}", "")
-            formatted_prompt = formatted_prompt.replace("{{question}}", question)
-            formatted_prompt = formatted_prompt.replace("{{answer}}", answer)
-
-            # Prepare payload for Claude API
-            payload = {
-                "model": self.model,
-                "max_tokens": 1024,
-                "messages": [{"role": "user", "content": formatted_prompt}],
-            }
-
-            # Make API request
-            response = requests.post(self.api_url, json=payload, headers=self.headers)
-
-            if response.status_code != 200:
-                raise ValueError(f"Anthropic Claude API error: {response.text}")
-
-            result = response.json()
-            content = result.get("content", [])
-
-            # Extract the text content from Claude's response
-            text_content = ""
-            for block in content:
-                if block.get("type") == "text":
-                    text_content += block.get("text", "")
-
-            # Extract JSON from the response
-            try:
-                # Try to find JSON in the response
-                json_start = text_content.find("{")
-                json_end = text_content.rfind("}") + 1
-
-                if json_start >= 0 and json_end > json_start:
-                    json_str = text_content[json_start:json_end]
-                    analysis_result = json.loads(json_str)
-                else:
-                    raise ValueError("No valid JSON found in response")
-
-                # Add question_id to the analysis result
-                analysis_result["question_id"] = question_id
-                results.append(analysis_result)
-
-            except json.JSONDecodeError:
-                raise ValueError(
-                    f"Failed to parse JSON from Claude response: {text_content}"
-                )
-
-        return results
+        if not qa_pairs:
+            return []
+
+        # Score pairs concurrently; gather() keeps results in input order
+        semaphore = asyncio.Semaphore(self.max_workers)
+        return await asyncio.gather(
+            *(
+                self._safe_analyze_pair(semaphore, qa_pair, role, yoe, skill)
+                for qa_pair in qa_pairs
+            )
+        )
+
+    async def _safe_analyze_pair(self, semaphore, qa_pair, role, yoe, skill):
+        """Score one QA pair, reporting a failure against its question_id"""
+        try:
+            async with semaphore:
+                return await self._analyze_pair(qa_pair, role, yoe, skill)
+        except Exception as e:
+            return {"question_id": qa_pair.get("question_id"), "error": str(e)}
+
+    async def _analyze_pair(self, qa_pair, role, yoe, skill):
+        """Send a single QA pair to Claude and return the parsed analysis"""
+        question_id = qa_pair["question_id"]
+        question = qa_pair["question"]
+        answer = qa_pair["answer"]
+
+        # Format the prompt with the current question and answer
+        formatted_prompt = self.prompt_template.replace("{{role}}", role)
+        formatted_prompt = formatted_prompt.replace("{{yoe}}", str(yoe))
+        formatted_prompt = formatted_prompt.replace("{{skill}}", qa_pair.get("skill") or skill)
+        # Notes written alongside the question at generation time, when available
+        formatted_prompt = formatted_prompt.replace(
+            "{{reference_notes}}", qa_pair.get("reference_notes") or ""
+        )
+        formatted_prompt = formatted_prompt.replace("{{question}}", question)
+        formatted_prompt = formatted_prompt.replace("{{answer}}", answer)
+
+        # Prepare payload for Claude API
+        payload = {
+            "model": self.model,
+            "max_tokens": 1024,
+            "system": self.system_prompt,
+            "messages": [{"role": "user", "content": formatted_prompt}],
+        }
+
+        # Make API request
+        try:
+            result = await llm_client.anthropic_messages(
+                payload, api_key=self.anthropic_api_key, timeout=self.timeout, site="scoring.answer"
+            )
+        except llm_client.LLMError as e:
+            raise ValueError(str(e))
+
+        # Extract the text content from Claude's response
+        text_content = llm_client.anthropic_text(result)
+
+        # Extract JSON from the response
+        try:
+            # Try to find JSON in the response
+            json_start = text_content.find("{")
+            json_end = text_content.rfind("}") + 1
+
+            if json_start >= 0 and json_end > json_start:
+                json_str = text_content[json_start:json_end]
+                analysis_result = json.loads(json_str)
+            else:
+                raise ValueError("No valid JSON found in response")
+
+        except json.JSONDecodeError:
+            raise ValueError(
+                f"Failed to parse JSON from Claude response: {text_content}"
+            )
+
+        # Add question_id to the analysis result
+        analysis_result["question_id"] = question_id
+        return analysis_result
@@ -0,0 +1,137 @@
+"""
+Speculative prefetch of interview follow-up questions.
+
+Follow-ups used to be generated only after the candidate answered the last
+pre-generated question, so every answer past that point waited for a full
+Claude completion. Now, as soon as the last queued question is served, a
+background task asks the generator for candidate follow-ups, one for each
+direction the follow-up prompt can take (clarify a vague answer, probe a
+good one, cover a gap), while the candidate is still answering. The
+candidates are stored on the session. When the answer arrives one is picked
+locally from cheap answer features, so the request path makes no LLM call.
+
+Tasks live in this process; the stored candidates are visible to every
+worker through the session store. A task is cancelled as soon as its
+candidates can no longer be used (the session ended or completed).
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.backend.schema import InterviewSession
+from app.backend.service import llm_telemetry
+
+load_dotenv()
+
+PREFETCH_ENABLED = os.getenv("QUESTION_PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Answers shorter than this get the "clarify" candidate
+PREFETCH_BRIEF_ANSWER_WORDS = int(os.getenv("QUESTION_PREFETCH_BRIEF_ANSWER_WORDS", "15"))
+
+# Phrases that suggest the answer revealed a gap
+GAP_MARKERS = (
+    "not sure",
+    "don't know",
+    "do not know",
+    "haven't",
+    "have not",
+    "never used",
+    "never worked",
+    "no experience",
+    "not familiar",
+    "unfamiliar",
+)
+
+CANDIDATE_KINDS = ("clarify", "deeper", "gap")
+
+# session_id -> in-flight prefetch task
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _is_last_queued_question(session: InterviewSession) -> bool:
+    return session.current_question_index + 1 >= len(session.questions)
+
+
+async def _prefetch(store, generator, session: InterviewSession) -> Optional[Dict]:
+    question_index = session.current_question_index
+    # Its own collector: the request that scheduled this task has finished by now
+    with llm_telemetry.collect_usage() as usage:
+        try:
+            candidates = await generator.generate_followup_candidates(
+                session, session.questions[question_index]
+            )
+        finally:
+            if usage.by_site:
+                await store.add_usage(session.session_id, usage.by_site)
+    if not candidates:
+        return None
+    prefetched = {"question_index": question_index, "candidates": candidates}
+    await store.set_prefetched(session.session_id, prefetched)
+    return prefetched
+
+
+def schedule(store, generator, session: InterviewSession) -> None:
+    """Start prefetching follow-ups when the session's current question is its last queued one"""
+    if not PREFETCH_ENABLED or session.status != "active":
+        return
+    if not _is_last_queued_question(session):
+        return
+    cancel(session.session_id)
+    task = asyncio.create_task(_prefetch(store, generator, session.model_copy(deep=True)))
+    _tasks[session.session_id] = task
+
+    def _forget(finished: asyncio.Task) -> None:
+        if _tasks.get(session.session_id) is finished:
+            del _tasks[session.session_id]
+        if not finished.cancelled() and finished.exception() is not None:
+            print(f"Follow-up prefetch failed for session {session.session_id}: {finished.exception()}")
+
+    task.add_done_callback(_forget)
+
+
+def cancel(session_id: str) -> None:
+    """Cancel the session's in-flight prefetch, if any"""
+    task = _tasks.pop(session_id, None)
+    if task is not None and not task.done():
+        task.cancel()
+
+
+async def take(session: InterviewSession) -> Optional[Dict]:
+    """Prefetched candidates for the session's current question, or None
+
+    Waits for a prefetch that is still running: it started while the
+    candidate was answering, so it finishes sooner than a fresh call would.
+    """
+    prefetched = None
+    task = _tasks.pop(session.session_id, None)
+    if task is not None:
+        try:
+            prefetched = await task
+        except (asyncio.CancelledError, Exception):
+            prefetched = None
+    if prefetched is None:
+        # Written by a task in this or another worker before the session was loaded
+        prefetched = session.prefetched_followups
+    if not prefetched or prefetched.get("question_index") != session.current_question_index:
+        return None
+    return prefetched["candidates"]
+
+
+def choose_followup(candidates: Dict, answer: str) -> Optional[str]:
+    """Pick the candidate matching the answer; None ends the interview"""
+    if candidates.get("end_interview"):
+        return None
+    answer_lower = answer.lower()
+    if len(answer.split()) < PREFETCH_BRIEF_ANSWER_WORDS:
+        preferred = "clarify"
+    elif any(marker in answer_lower for marker in GAP_MARKERS):
+        preferred = "gap"
+    else:
+        preferred = "deeper"
+    for kind in (preferred, *CANDIDATE_KINDS):
+        if candidates.get(kind):
+            return candidates[kind]
+    return None
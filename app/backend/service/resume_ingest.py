@@ -0,0 +1,149 @@
+"""
+Parse-on-ingest pipeline for job application resumes.
+
+The resume attached to an application is extracted and parsed once, by the
+parse_resume background task that /apply enqueues, and the structured result
+is stored in JobApplication.parsed_resume together with the content hash of
+the extracted text. Screening and interview start read that stored JSON instead of running
+text extraction and the LLM parse again.
+
+Stored shape of parsed_resume:
+    {"content_hash": "<sha256 of extracted text>",
+     "parsed_at": "<ISO timestamp>",
+     "resume": {...PARSE_RESUME_PROMPT output...}}
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.backend import database, models
+from app.backend.prompts.prompt import get_prompt
+from app.backend.schema import (ExperienceRequiredData, JobDescriptionData,
+                                ResumeData, SkillsData)
+from app.backend.service.parse_cache import content_hash
+
+
+def _split_skills(value: Optional[str]) -> list:
+    return [skill.strip() for skill in (value or "").split(",") if skill.strip()]
+
+
+def job_to_jd_dict(job: models.Job) -> Dict:
+    """JD JSON (PARSE_JD_PROMPT shape) built from a stored job, no LLM needed"""
+    return {
+        "title": job.title,
+        "company": job.company,
+        "experience_required": {"min_years": _min_years(job.experience), "max_years": None},
+        "skills": {
+            "must_have": _split_skills(job.must_have_skills),
+            "good_to_have": _split_skills(job.good_to_have_skills),
+        },
+        "responsibilities": [
+            line.strip(" -•\t") for line in job.key_responsibilities.splitlines() if line.strip(" -•\t")
+        ],
+        "location": job.location,
+        "employment_type": job.job_type,
+    }
+
+
+def _min_years(experience: Optional[str]) -> Optional[int]:
+    digits = "".join(ch if ch.isdigit() else " " for ch in experience or "").split()
+    return int(digits[0]) if digits else None
+
+
+def job_to_jd_data(job: models.Job) -> JobDescriptionData:
+    """Interview JobDescriptionData for a stored job"""
+    jd = job_to_jd_dict(job)
+    return JobDescriptionData(
+        company=jd["company"],
+        skills=SkillsData(
+            must_have=jd["skills"]["must_have"],
+            nice_to_have=jd["skills"]["good_to_have"] or None,
+        ),
+        experience_required=ExperienceRequiredData(
+            min_years=jd["experience_required"]["min_years"] or 0
+        ),
+        responsibilities=jd["responsibilities"],
+    )
+
+
+def stored_resume(application: models.JobApplication) -> Optional[Dict]:
+    """Parsed resume JSON stored on the application, if any"""
+    parsed = application.parsed_resume or {}
+    return parsed.get("resume")
+
+
+def resume_to_resume_data(application: models.JobApplication, resume: Dict) -> ResumeData:
+    """Interview ResumeData from a stored parse, falling back to application fields"""
+    return ResumeData(
+        candidate_first_name=resume.get("candidate_first_name") or application.first_name,
+        candidate_last_name=resume.get("candidate_last_name") or application.last_name,
+        primary_skills=resume.get("primary_skills") or [],
+        secondary_skills=resume.get("secondary_skills") or [],
+        domain_expertise=resume.get("domain_expertise") or [],
+    )
+
+
+def _load_resume_path(application_id: int) -> Optional[tuple]:
+    with database.SessionLocal() as db:
+        application = db.get(models.JobApplication, application_id)
+        if application is None:
+            return None
+        return application.resume_path, application.parsed_resume
+
+
+def _store_parsed_resume(application_id: int, parsed_resume: Dict) -> None:
+    with database.SessionLocal() as db:
+        application = db.get(models.JobApplication, application_id)
+        if application is None:
+            return
+        application.parsed_resume = parsed_resume
+        db.commit()
+
+
+async def parse_application_resume(application_id: int, force: bool = False) -> Dict:
+    """Extract and parse an application's resume, storing the result
+
+    Returns the parsed resume JSON, or a dict with an "error" key. Skips the
+    LLM entirely when the stored parse matches the file's content hash.
+    """
+    # Imported lazily: the parser pulls in PDF and prompt libraries
+    from app.backend.service.parser import get_text_from_storage, parse_with_ai
+    from app.backend.service.storage import StorageError
+
+    loaded = await asyncio.to_thread(_load_resume_path, application_id)
+    if loaded is None:
+        return {"error": f"Job application {application_id} not found"}
+    resume_path, existing = loaded
+
+    try:
+        text = await asyncio.to_thread(get_text_from_storage, resume_path)
+    except (OSError, ValueError, ImportError, StorageError) as e:
+        return {"error": f"Resume text extraction failed: {e}"}
+
+    text_hash = content_hash(text)
+    if not force and existing and existing.get("content_hash") == text_hash:
+        return existing["resume"]
+
+    resume = await parse_with_ai(text, get_prompt("parse_resume"))
+    if "error" in resume:
+        return resume
+
+    await asyncio.to_thread(
+        _store_parsed_resume,
+        application_id,
+        {
+            "content_hash": text_hash,
+            "parsed_at": datetime.utcnow().isoformat(),
+            "resume": resume,
+        },
+    )
+    return resume
+
+
+async def get_or_parse_resume(application: models.JobApplication) -> Dict:
+    """Stored parse for an application, parsing on demand if ingest has not run yet"""
+    resume = stored_resume(application)
+    if resume is not None:
+        return resume
+    return await parse_application_resume(application.id)
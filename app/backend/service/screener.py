@@ -3,11 +3,11 @@ import os
 import re
 from typing import Dict
 
-import requests
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.backend.prompt.prompt import get_prompt
+from app.backend.prompts.prompt import get_prompt
+from app.backend.service import llm_client
 
 load_dotenv()
 
@@ -21,14 +21,14 @@ SCREEN_LLM_MODEL = (
 )
 
 
-def screen_candidate_with_ai(jd: Dict, resume: Dict) -> Dict:
+async def screen_candidate_with_ai(jd: Dict, resume: Dict) -> Dict:
     """Prescreen a candidate against a JD using the LLM.
 
     Parameters:
     - jd: Parsed JD JSON dict.
     - resume: Parsed Resume JSON dict.
 
-    Returns a structured JSON dict as defined by the SCREEN_CANDIDATE_PROMPT.
+    Returns a structured JSON dict as defined by the SCREEN_CANDIDATE_SYSTEM_PROMPT.
     The model used can be configured via .env using SCREEN_LLM_MODEL (preferred),
     or LLM_MODEL_SCREEN, or it will fall back to LLM_MODEL.
     """
@@ -46,22 +46,21 @@ def screen_candidate_with_ai(jd: Dict, resume: Dict) -> Dict:
 
     user_content = effective_prompt.format(jd=jd_json, resume=resume_json)
 
+    # Static instructions first so the provider can reuse the cached prefix
     payload = {
         "model": SCREEN_LLM_MODEL,
-        "messages": [{"role": "user", "content": user_content}],
+        "messages": [
+            {"role": "system", "content": get_prompt("screen_candidate_system")},
+            {"role": "user", "content": user_content},
+        ],
     }
 
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    response = requests.post(API_URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        return {"error": f"API call failed {response.status_code}: {response.text}"}
+    try:
+        response_json = await llm_client.chat_completion(payload, API_URL, API_KEY, site="screener.screen")
+    except llm_client.LLMError as e:
+        return {"error": str(e)}
 
     try:
-        response_json = response.json()
         response_text = response_json["choices"][0]["message"]["content"].strip()
     except Exception as e:
         return {"error": f"Bad response format: {str(e)}"}
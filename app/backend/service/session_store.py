@@ -0,0 +1,671 @@
+"""
+Interview session storage backends.
+
+Sessions used to live in a dict inside main.py, which tied every interview to
+one uvicorn process. The stores below share one interface so sessions can be
+kept in memory (single process, development), in a SQL database
+(SQLite/Postgres) or in any Redis-protocol server, selected with SESSION_STORE.
+
+Writes are incremental: answering a question appends one response (and at
+most one new question) instead of rewriting the whole session. Every write
+refreshes the session's TTL; expired sessions are treated as missing.
+
+A turn is a compare-and-set on current_question_index: of two requests that
+answered the same question, only the first is recorded. A streamed follow-up
+takes two steps: the answer is stored first with status "generating", and
+add_followup completes the turn once the question is written.
+"""
+
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.backend import database, models
+from app.backend.schema import InterviewSession, QuestionResponse
+from app.backend.service.llm_telemetry import add_totals
+
+# Optional backend: redis-py asyncio client (works with any Redis-protocol server)
+try:
+    import redis.asyncio as aioredis  # type: ignore
+    _HAVE_REDIS = True
+except Exception:
+    aioredis = None  # type: ignore
+    _HAVE_REDIS = False
+
+load_dotenv()
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class SessionStore(ABC):
+    """Interface shared by all interview session backends"""
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def create(self, session: InterviewSession) -> None:
+        """Persist a brand new session"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        """Return the session, or None if it does not exist or has expired"""
+
+    @abstractmethod
+    async def append_turn(
+        self,
+        session_id: str,
+        expected_index: int,
+        response: QuestionResponse,
+        current_question_index: int,
+        status: str,
+        new_question: Optional[str] = None,
+    ) -> bool:
+        """Record one answered question, plus the follow-up question if one was generated
+
+        Applied only while the session is active and still at expected_index;
+        returns False (writing nothing) when another turn got there first.
+        """
+
+    @abstractmethod
+    async def add_followup(
+        self,
+        session_id: str,
+        expected_index: int,
+        current_question_index: int,
+        status: str,
+        new_question: Optional[str] = None,
+    ) -> bool:
+        """Complete a turn whose answer append_turn stored with status "generating"
+
+        Applied only while the session is still generating at expected_index.
+        """
+
+    @abstractmethod
+    async def set_status(self, session_id: str, status: str) -> None:
+        """Update only the session status"""
+
+    @abstractmethod
+    async def set_prefetched(self, session_id: str, prefetched: Optional[Dict]) -> None:
+        """Store (or clear, with None) the session's prefetched follow-up candidates"""
+
+    @abstractmethod
+    async def add_usage(self, session_id: str, usage_by_site: Dict[str, Dict]) -> None:
+        """Add per-site LLM usage totals to the session's running totals"""
+
+    @abstractmethod
+    async def list_sessions(self) -> List[InterviewSession]:
+        """Return every live (non-expired) session"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; only suitable for a single worker
+
+    Sessions are copied in and out so callers get the same detached-snapshot
+    semantics as the shared backends.
+    """
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self._sessions: Dict[str, Tuple[InterviewSession, float]] = {}
+
+    def _touch(self, session: InterviewSession) -> None:
+        self._sessions[session.session_id] = (session, time.monotonic() + self.ttl_seconds)
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for session_id in [sid for sid, (_, exp) in self._sessions.items() if exp <= now]:
+            del self._sessions[session_id]
+
+    def _live(self, session_id: str) -> Optional[InterviewSession]:
+        self._purge_expired()
+        entry = self._sessions.get(session_id)
+        return entry[0] if entry else None
+
+    async def create(self, session: InterviewSession) -> None:
+        self._touch(session.model_copy(deep=True))
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        session = self._live(session_id)
+        return session.model_copy(deep=True) if session else None
+
+    async def append_turn(
+        self, session_id, expected_index, response, current_question_index, status, new_question=None
+    ):
+        return self._advance(
+            session_id, "active", expected_index, current_question_index, status, response, new_question
+        )
+
+    async def add_followup(self, session_id, expected_index, current_question_index, status, new_question=None):
+        return self._advance(
+            session_id, "generating", expected_index, current_question_index, status, None, new_question
+        )
+
+    def _advance(
+        self, session_id, expected_status, expected_index, current_question_index, status, response, new_question
+    ):
+        # Called without awaiting anything, so check and write are atomic on the event loop
+        session = self._live(session_id)
+        if session is None or (session.status, session.current_question_index) != (expected_status, expected_index):
+            return False
+        if response is not None:
+            session.question_responses.append(response)
+        if new_question is not None:
+            session.questions.append(new_question)
+        session.current_question_index = current_question_index
+        session.status = status
+        self._touch(session)
+        return True
+
+    async def set_status(self, session_id: str, status: str) -> None:
+        session = self._live(session_id)
+        if session is None:
+            return
+        session.status = status
+        self._touch(session)
+
+    async def set_prefetched(self, session_id: str, prefetched: Optional[Dict]) -> None:
+        session = self._live(session_id)
+        if session is None:
+            return
+        session.prefetched_followups = prefetched
+        self._touch(session)
+
+    async def add_usage(self, session_id: str, usage_by_site: Dict[str, Dict]) -> None:
+        session = self._live(session_id)
+        if session is None:
+            return
+        session.llm_usage = _merge_usage(session.llm_usage, usage_by_site)
+        self._touch(session)
+
+    async def list_sessions(self) -> List[InterviewSession]:
+        self._purge_expired()
+        return [session.model_copy(deep=True) for session, _ in self._sessions.values()]
+
+
+class SQLSessionStore(SessionStore):
+    """SQLAlchemy-backed store (SQLite or Postgres) shared by every worker
+
+    Uses SESSION_STORE_URL when set, otherwise the application database.
+    Blocking DB calls run in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, url: Optional[str] = SESSION_STORE_URL, ttl_seconds: int = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        if url:
+            self._engine = create_engine(url)
+            self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        else:
+            self._engine = database.engine
+            self._session_factory = database.SessionLocal
+
+    TABLES = [
+        models.InterviewSessionRecord.__table__,
+        models.InterviewSessionQuestion.__table__,
+        models.InterviewSessionResponse.__table__,
+    ]
+
+    @property
+    def engine(self):
+        return self._engine
+
+    def create_tables(self) -> None:
+        """Create the session tables (run by the migrate command, not at startup)"""
+        database.Base.metadata.create_all(bind=self._engine, tables=self.TABLES)
+
+    def _expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+
+    @staticmethod
+    def _to_schema(record: "models.InterviewSessionRecord") -> InterviewSession:
+        return InterviewSession(
+            session_id=record.session_id,
+            resume_data=record.resume_data,
+            jd_data=record.jd_data,
+            current_question_index=record.current_question_index,
+            questions=[q.text for q in record.questions],
+            question_responses=[
+                QuestionResponse(question=r.question, answer=r.answer, timestamp=r.timestamp)
+                for r in record.responses
+            ],
+            status=record.status,
+            created_at=record.created_at,
+            prefetched_followups=record.prefetched_followups,
+            question_notes=record.question_notes or [],
+            llm_usage=record.llm_usage or {},
+        )
+
+    def _live_record(self, db, session_id: str):
+        return (
+            db.query(models.InterviewSessionRecord)
+            .filter(
+                models.InterviewSessionRecord.session_id == session_id,
+                models.InterviewSessionRecord.expires_at > datetime.utcnow(),
+            )
+            .first()
+        )
+
+    @staticmethod
+    def _next_position(db, child, session_id: str) -> int:
+        last = db.query(func.max(child.position)).filter(child.session_id == session_id).scalar()
+        return 0 if last is None else last + 1
+
+    def _create(self, session: InterviewSession) -> None:
+        with self._session_factory() as db:
+            db.add(
+                models.InterviewSessionRecord(
+                    session_id=session.session_id,
+                    resume_data=session.resume_data.model_dump(),
+                    jd_data=session.jd_data.model_dump(),
+                    current_question_index=session.current_question_index,
+                    status=session.status,
+                    created_at=session.created_at,
+                    expires_at=self._expiry(),
+                    question_notes=session.question_notes,
+                    llm_usage=session.llm_usage,
+                )
+            )
+            db.add_all(
+                models.InterviewSessionQuestion(session_id=session.session_id, position=i, text=q)
+                for i, q in enumerate(session.questions)
+            )
+            db.add_all(
+                models.InterviewSessionResponse(
+                    session_id=session.session_id,
+                    position=i,
+                    question=r.question,
+                    answer=r.answer,
+                    timestamp=r.timestamp,
+                )
+                for i, r in enumerate(session.question_responses)
+            )
+            db.commit()
+
+    def _get(self, session_id: str) -> Optional[InterviewSession]:
+        with self._session_factory() as db:
+            record = self._live_record(db, session_id)
+            return self._to_schema(record) if record else None
+
+    def _advance(self, db, session_id: str, expected_status: str, expected_index: int, values: Dict) -> bool:
+        """Conditional UPDATE of the session row; False when it moved past expected_status/index
+
+        The UPDATE takes the row (Postgres) or database (SQLite) write lock and
+        re-checks the condition against committed data, so of two concurrent
+        turns only one matches.
+        """
+        updated = (
+            db.query(models.InterviewSessionRecord)
+            .filter(
+                models.InterviewSessionRecord.session_id == session_id,
+                models.InterviewSessionRecord.expires_at > datetime.utcnow(),
+                models.InterviewSessionRecord.status == expected_status,
+                models.InterviewSessionRecord.current_question_index == expected_index,
+            )
+            .update({**values, "expires_at": self._expiry()}, synchronize_session=False)
+        )
+        return updated == 1
+
+    def _append_turn(self, session_id, expected_index, response, current_question_index, status, new_question):
+        with self._session_factory() as db:
+            if not self._advance(
+                db,
+                session_id,
+                "active",
+                expected_index,
+                {"current_question_index": current_question_index, "status": status},
+            ):
+                db.rollback()
+                return False
+            db.add(
+                models.InterviewSessionResponse(
+                    session_id=session_id,
+                    position=self._next_position(db, models.InterviewSessionResponse, session_id),
+                    question=response.question,
+                    answer=response.answer,
+                    timestamp=response.timestamp,
+                )
+            )
+            if new_question is not None:
+                db.add(
+                    models.InterviewSessionQuestion(
+                        session_id=session_id,
+                        position=self._next_position(db, models.InterviewSessionQuestion, session_id),
+                        text=new_question,
+                    )
+                )
+            db.commit()
+            return True
+
+    def _add_followup(self, session_id, expected_index, current_question_index, status, new_question):
+        with self._session_factory() as db:
+            if not self._advance(
+                db,
+                session_id,
+                "generating",
+                expected_index,
+                {"current_question_index": current_question_index, "status": status},
+            ):
+                db.rollback()
+                return False
+            if new_question is not None:
+                db.add(
+                    models.InterviewSessionQuestion(
+                        session_id=session_id,
+                        position=self._next_position(db, models.InterviewSessionQuestion, session_id),
+                        text=new_question,
+                    )
+                )
+            db.commit()
+            return True
+
+    def _set_status(self, session_id: str, status: str) -> None:
+        with self._session_factory() as db:
+            record = self._live_record(db, session_id)
+            if record is None:
+                return
+            record.status = status
+            record.expires_at = self._expiry()
+            db.commit()
+
+    def _set_prefetched(self, session_id: str, prefetched: Optional[Dict]) -> None:
+        with self._session_factory() as db:
+            record = self._live_record(db, session_id)
+            if record is None:
+                return
+            record.prefetched_followups = prefetched
+            db.commit()
+
+    def _add_usage(self, session_id: str, usage_by_site: Dict[str, Dict]) -> None:
+        with self._session_factory() as db:
+            # Row lock so concurrent requests on one session do not lose each other's totals
+            record = (
+                db.query(models.InterviewSessionRecord)
+                .filter(
+                    models.InterviewSessionRecord.session_id == session_id,
+                    models.InterviewSessionRecord.expires_at > datetime.utcnow(),
+                )
+                .with_for_update()
+                .first()
+            )
+            if record is None:
+                return
+            # Reassigned rather than mutated so the JSON column is marked dirty
+            record.llm_usage = _merge_usage(record.llm_usage or {}, usage_by_site)
+            db.commit()
+
+    def _list_sessions(self) -> List[InterviewSession]:
+        with self._session_factory() as db:
+            # Expired rows are cleaned up lazily on listing; children are deleted
+            # explicitly because SQLite does not enforce ON DELETE CASCADE by default
+            expired = (
+                db.query(models.InterviewSessionRecord.session_id)
+                .filter(models.InterviewSessionRecord.expires_at <= datetime.utcnow())
+                .scalar_subquery()
+            )
+            for child in (models.InterviewSessionQuestion, models.InterviewSessionResponse):
+                db.query(child).filter(child.session_id.in_(expired)).delete(
+                    synchronize_session=False
+                )
+            db.query(models.InterviewSessionRecord).filter(
+                models.InterviewSessionRecord.session_id.in_(expired)
+            ).delete(synchronize_session=False)
+            db.commit()
+            records = db.query(models.InterviewSessionRecord).all()
+            return [self._to_schema(record) for record in records]
+
+    async def create(self, session: InterviewSession) -> None:
+        await asyncio.to_thread(self._create, session)
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        return await asyncio.to_thread(self._get, session_id)
+
+    async def append_turn(
+        self, session_id, expected_index, response, current_question_index, status, new_question=None
+    ):
+        return await asyncio.to_thread(
+            self._append_turn,
+            session_id,
+            expected_index,
+            response,
+            current_question_index,
+            status,
+            new_question,
+        )
+
+    async def add_followup(self, session_id, expected_index, current_question_index, status, new_question=None):
+        return await asyncio.to_thread(
+            self._add_followup, session_id, expected_index, current_question_index, status, new_question
+        )
+
+    async def set_status(self, session_id: str, status: str) -> None:
+        await asyncio.to_thread(self._set_status, session_id, status)
+
+    async def set_prefetched(self, session_id: str, prefetched: Optional[Dict]) -> None:
+        await asyncio.to_thread(self._set_prefetched, session_id, prefetched)
+
+    async def add_usage(self, session_id: str, usage_by_site: Dict[str, Dict]) -> None:
+        await asyncio.to_thread(self._add_usage, session_id, usage_by_site)
+
+    async def list_sessions(self) -> List[InterviewSession]:
+        return await asyncio.to_thread(self._list_sessions)
+
+
+class RedisSessionStore(SessionStore):
+    """Store for any Redis-protocol server (Redis, Valkey, KeyDB, ...)
+
+    Layout per session: a hash with the scalar fields, plus two lists holding
+    questions and responses so a turn is a couple of RPUSH/HSET commands.
+    A sorted set indexes live sessions by expiry time for listing.
+    """
+
+    INDEX_KEY = "interview:index"
+
+    # KEYS: meta, questions, responses, usage, index
+    # ARGV: expected status, expected index, response JSON, new index, status,
+    #       new question, ttl, index score, session id ("" response/question: none)
+    TURN_SCRIPT = """
+    local status = redis.call('HGET', KEYS[1], 'status')
+    if status ~= ARGV[1] or redis.call('HGET', KEYS[1], 'current_question_index') ~= ARGV[2] then
+        return 0
+    end
+    if ARGV[3] ~= '' then
+        redis.call('RPUSH', KEYS[3], ARGV[3])
+    end
+    if ARGV[6] ~= '' then
+        redis.call('RPUSH', KEYS[2], ARGV[6])
+    end
+    redis.call('HSET', KEYS[1], 'current_question_index', ARGV[4], 'status', ARGV[5])
+    for i = 1, 4 do
+        redis.call('EXPIRE', KEYS[i], ARGV[7])
+    end
+    redis.call('ZADD', KEYS[5], ARGV[8], ARGV[9])
+    return 1
+    """
+
+    def __init__(self, url: str = REDIS_URL, ttl_seconds: int = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        if not _HAVE_REDIS:
+            raise ImportError(
+                "SESSION_STORE=redis requires the 'redis' package (pip install redis)."
+            )
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        # Check-and-write in one server-side step; MULTI alone cannot branch on a read
+        self._turn_script = self._redis.register_script(self.TURN_SCRIPT)
+
+    @staticmethod
+    def _keys(session_id: str) -> Tuple[str, str, str]:
+        base = f"interview:{session_id}"
+        return base, f"{base}:questions", f"{base}:responses"
+
+    @staticmethod
+    def _usage_key(session_id: str) -> str:
+        # Hash of "<site>|<total>" -> number, bumped with HINCRBYFLOAT so
+        # concurrent requests never overwrite each other
+        return f"interview:{session_id}:llm_usage"
+
+    def _expire_all(self, pipe, session_id: str) -> None:
+        for key in (*self._keys(session_id), self._usage_key(session_id)):
+            pipe.expire(key, self.ttl_seconds)
+        pipe.zadd(self.INDEX_KEY, {session_id: time.time() + self.ttl_seconds})
+
+    async def create(self, session: InterviewSession) -> None:
+        meta_key, questions_key, responses_key = self._keys(session.session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                meta_key,
+                mapping={
+                    "resume_data": session.resume_data.model_dump_json(),
+                    "jd_data": session.jd_data.model_dump_json(),
+                    "current_question_index": session.current_question_index,
+                    "status": session.status,
+                    "created_at": session.created_at.isoformat(),
+                    "question_notes": json.dumps(session.question_notes),
+                },
+            )
+            if session.questions:
+                pipe.rpush(questions_key, *session.questions)
+            if session.question_responses:
+                pipe.rpush(responses_key, *(r.model_dump_json() for r in session.question_responses))
+            if session.llm_usage:
+                pipe.hset(
+                    self._usage_key(session.session_id),
+                    mapping={
+                        f"{site}|{name}": value
+                        for site, totals in session.llm_usage.items()
+                        for name, value in totals.items()
+                    },
+                )
+            self._expire_all(pipe, session.session_id)
+            await pipe.execute()
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        meta_key, questions_key, responses_key = self._keys(session_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(meta_key)
+            pipe.lrange(questions_key, 0, -1)
+            pipe.lrange(responses_key, 0, -1)
+            pipe.hgetall(self._usage_key(session_id))
+            meta, questions, responses, usage = await pipe.execute()
+        if not meta:
+            return None
+        return InterviewSession(
+            session_id=session_id,
+            resume_data=json.loads(meta["resume_data"]),
+            jd_data=json.loads(meta["jd_data"]),
+            current_question_index=int(meta["current_question_index"]),
+            questions=questions,
+            question_responses=[QuestionResponse.model_validate_json(r) for r in responses],
+            status=meta["status"],
+            created_at=datetime.fromisoformat(meta["created_at"]),
+            prefetched_followups=json.loads(meta["prefetched_followups"]) if meta.get("prefetched_followups") else None,
+            question_notes=json.loads(meta.get("question_notes") or "[]"),
+            llm_usage=_usage_from_hash(usage),
+        )
+
+    async def append_turn(
+        self, session_id, expected_index, response, current_question_index, status, new_question=None
+    ):
+        return await self._advance(
+            session_id, "active", expected_index, current_question_index, status, response, new_question
+        )
+
+    async def add_followup(self, session_id, expected_index, current_question_index, status, new_question=None):
+        return await self._advance(
+            session_id, "generating", expected_index, current_question_index, status, None, new_question
+        )
+
+    async def _advance(
+        self, session_id, expected_status, expected_index, current_question_index, status, response, new_question
+    ) -> bool:
+        applied = await self._turn_script(
+            keys=[*self._keys(session_id), self._usage_key(session_id), self.INDEX_KEY],
+            args=[
+                expected_status,
+                expected_index,
+                response.model_dump_json() if response is not None else "",
+                current_question_index,
+                status,
+                new_question or "",
+                self.ttl_seconds,
+                time.time() + self.ttl_seconds,
+                session_id,
+            ],
+        )
+        return bool(applied)
+
+    async def set_status(self, session_id: str, status: str) -> None:
+        meta_key, _, _ = self._keys(session_id)
+        if not await self._redis.exists(meta_key):
+            return
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(meta_key, "status", status)
+            self._expire_all(pipe, session_id)
+            await pipe.execute()
+
+    async def set_prefetched(self, session_id: str, prefetched: Optional[Dict]) -> None:
+        meta_key, _, _ = self._keys(session_id)
+        if not await self._redis.exists(meta_key):
+            return
+        if prefetched is None:
+            await self._redis.hdel(meta_key, "prefetched_followups")
+        else:
+            await self._redis.hset(meta_key, "prefetched_followups", json.dumps(prefetched))
+
+    async def add_usage(self, session_id: str, usage_by_site: Dict[str, Dict]) -> None:
+        meta_key, _, _ = self._keys(session_id)
+        if not usage_by_site or not await self._redis.exists(meta_key):
+            return
+        usage_key = self._usage_key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for site, totals in usage_by_site.items():
+                for name, value in totals.items():
+                    if value:
+                        pipe.hincrbyfloat(usage_key, f"{site}|{name}", value)
+            pipe.expire(usage_key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def list_sessions(self) -> List[InterviewSession]:
+        now = time.time()
+        await self._redis.zremrangebyscore(self.INDEX_KEY, "-inf", now)
+        session_ids = await self._redis.zrangebyscore(self.INDEX_KEY, now, "+inf")
+        sessions = await asyncio.gather(*(self.get(sid) for sid in session_ids))
+        return [session for session in sessions if session is not None]
+
+
+def _merge_usage(current: Dict[str, Dict], usage_by_site: Dict[str, Dict]) -> Dict[str, Dict]:
+    merged = {site: dict(totals) for site, totals in current.items()}
+    for site, totals in usage_by_site.items():
+        add_totals(merged.setdefault(site, {}), totals)
+    return merged
+
+
+def _usage_from_hash(fields: Dict[str, str]) -> Dict[str, Dict]:
+    usage: Dict[str, Dict] = {}
+    for field, value in (fields or {}).items():
+        site, _, name = field.rpartition("|")
+        number = float(value)
+        usage.setdefault(site, {})[name] = number if name in ("latency_seconds", "cost_usd") else int(number)
+    return usage
+
+
+def get_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    """Build the session store selected by SESSION_STORE (memory, sql or redis)"""
+    backend = backend.strip().lower()
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend in ("sql", "sqlite", "postgres", "postgresql"):
+        return SQLSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
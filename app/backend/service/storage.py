@@ -0,0 +1,291 @@
+"""
+Blob storage for uploaded resumes.
+
+JobApplication.resume_path holds a storage key (e.g. "resumes/ab/<sha256>.pdf")
+rather than a path on whichever node took the upload. The backend is selected
+with STORAGE_BACKEND:
+
+- local: files under STORAGE_LOCAL_ROOT on this machine (development, or a
+  shared volume). Download URLs are signed with itsdangerous and served by the
+  /files endpoint.
+- s3: any S3-protocol service (AWS S3, MinIO, ...; set S3_ENDPOINT_URL for
+  non-AWS). Download URLs are S3 presigned URLs. Needs boto3.
+
+Keys written by older versions (paths like "uploads/resumes/x.pdf") still
+resolve with the local backend.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import AsyncIterator, ContextManager, Iterator, Optional
+
+import aiofiles
+import aiofiles.os
+from dotenv import load_dotenv
+
+# Optional backend: boto3 for S3-compatible object storage
+try:
+    import boto3  # type: ignore
+    from botocore.exceptions import ClientError  # type: ignore
+    _HAVE_BOTO3 = True
+except Exception:
+    boto3 = None  # type: ignore
+    ClientError = Exception  # type: ignore
+    _HAVE_BOTO3 = False
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", "uploads")
+# Base URL for local signed download links (empty: relative "/files/..." URLs)
+STORAGE_PUBLIC_BASE_URL = os.getenv("STORAGE_PUBLIC_BASE_URL", "")
+STORAGE_URL_EXPIRES = int(os.getenv("STORAGE_URL_EXPIRES", "900"))
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_REGION = os.getenv("S3_REGION")
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class StorageError(Exception):
+    """Raised when a blob is missing or the backend call fails"""
+
+
+class BlobStorage(ABC):
+    """Interface shared by all storage backends; keys are "/"-separated"""
+
+    @abstractmethod
+    async def put_file(self, local_path: str, key: str) -> None:
+        """Store a local file under key, consuming (moving or deleting) local_path.
+        Keys are content-addressed, so an existing key is left as is."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether a blob is stored under key"""
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        """Size of the blob in bytes"""
+
+    @abstractmethod
+    def stream(
+        self, key: str, start: int = 0, end: Optional[int] = None, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive, like HTTP ranges) in chunks"""
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(key, start, end)])
+
+    @abstractmethod
+    def presigned_url(self, key: str, expires_in: int = STORAGE_URL_EXPIRES) -> str:
+        """Time-limited download URL that needs no other credentials"""
+
+    @abstractmethod
+    def local_copy(self, key: str) -> ContextManager[str]:
+        """Blocking: a context manager giving a local file path with the blob's
+        content (for PDF/DOCX parsers)"""
+
+
+class LocalStorage(BlobStorage):
+    """Files on the local filesystem under root"""
+
+    def __init__(self, root: str = STORAGE_LOCAL_ROOT):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        normalized = os.path.normpath(key)
+        if normalized.startswith("..") or os.path.isabs(normalized):
+            # Legacy rows stored full paths; anything else must stay under root
+            if os.path.isfile(key):
+                return key
+            raise StorageError(f"Invalid storage key: {key}")
+        if normalized.startswith(os.path.normpath(self.root) + os.sep):
+            return normalized
+        return os.path.join(self.root, normalized)
+
+    async def put_file(self, local_path: str, key: str) -> None:
+        path = self.path(key)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        if await aiofiles.os.path.exists(path):
+            await aiofiles.os.remove(local_path)
+        else:
+            await aiofiles.os.replace(local_path, path)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            return await aiofiles.os.path.isfile(self.path(key))
+        except StorageError:
+            return False
+
+    async def size(self, key: str) -> int:
+        try:
+            return await aiofiles.os.path.getsize(self.path(key))
+        except OSError as e:
+            raise StorageError(f"Blob not found: {key}") from e
+
+    async def stream(self, key, start=0, end=None, chunk_size=STREAM_CHUNK_SIZE):
+        try:
+            async with aiofiles.open(self.path(key), "rb") as f:
+                await f.seek(start)
+                remaining = None if end is None else end - start + 1
+                while remaining is None or remaining > 0:
+                    chunk = await f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                    if not chunk:
+                        return
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+        except OSError as e:
+            raise StorageError(f"Blob not found: {key}") from e
+
+    def presigned_url(self, key: str, expires_in: int = STORAGE_URL_EXPIRES) -> str:
+        return f"{STORAGE_PUBLIC_BASE_URL}/files/{sign_key(key, expires_in)}"
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise StorageError(f"Blob not found: {key}")
+        yield path
+
+
+class S3Storage(BlobStorage):
+    """Objects in an S3-compatible bucket; blocking boto3 calls run in threads"""
+
+    def __init__(
+        self,
+        bucket: Optional[str] = S3_BUCKET,
+        prefix: str = S3_PREFIX,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: Optional[str] = S3_REGION,
+    ):
+        if not _HAVE_BOTO3:
+            raise ImportError("STORAGE_BACKEND=s3 needs boto3 (pip install boto3)")
+        if not bucket:
+            raise ValueError("S3_BUCKET environment variable is required for STORAGE_BACKEND=s3")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        # boto3 clients are thread-safe, one per process is enough
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise StorageError(f"S3 head_object failed for {key}: {e}") from e
+
+    def _put_file(self, local_path: str, key: str) -> None:
+        try:
+            if self._head(key) is None:
+                # upload_file switches to multipart uploads for large files
+                self.client.upload_file(local_path, self.bucket, self.object_key(key))
+        finally:
+            os.remove(local_path)
+
+    async def put_file(self, local_path: str, key: str) -> None:
+        await asyncio.to_thread(self._put_file, local_path, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._head, key) is not None
+
+    async def size(self, key: str) -> int:
+        head = await asyncio.to_thread(self._head, key)
+        if head is None:
+            raise StorageError(f"Blob not found: {key}")
+        return head["ContentLength"]
+
+    def _get_body(self, key: str, start: int, end: Optional[int]):
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        try:
+            return self.client.get_object(
+                Bucket=self.bucket, Key=self.object_key(key), Range=byte_range
+            )["Body"]
+        except ClientError as e:
+            raise StorageError(f"S3 get_object failed for {key}: {e}") from e
+
+    async def stream(self, key, start=0, end=None, chunk_size=STREAM_CHUNK_SIZE):
+        body = await asyncio.to_thread(self._get_body, key, start, end)
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def presigned_url(self, key: str, expires_in: int = STORAGE_URL_EXPIRES) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.object_key(key)},
+            ExpiresIn=expires_in,
+        )
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        # Keep the extension: text extraction dispatches on it
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        try:
+            with os.fdopen(fd, "wb") as f:
+                body = self._get_body(key, 0, None)
+                shutil.copyfileobj(body, f, STREAM_CHUNK_SIZE)
+            yield path
+        finally:
+            os.remove(path)
+
+
+def _signer():
+    from itsdangerous import URLSafeSerializer
+
+    from app.backend.security import SECRET_KEY
+
+    return URLSafeSerializer(SECRET_KEY, salt="storage-download")
+
+
+def sign_key(key: str, expires_in: int = STORAGE_URL_EXPIRES) -> str:
+    """Signed token embedding the key and its expiry (local download URLs)"""
+    return _signer().dumps({"key": key, "exp": int(time.time()) + expires_in})
+
+
+def unsign_key(token: str) -> str:
+    """Key from a sign_key token; raises StorageError if invalid or expired"""
+    from itsdangerous import BadSignature
+
+    try:
+        data = _signer().loads(token)
+        key, expires_at = data["key"], data["exp"]
+    except (BadSignature, KeyError, TypeError) as e:
+        raise StorageError("Invalid download link") from e
+    if time.time() > expires_at:
+        raise StorageError("Download link has expired")
+    return key
+
+
+def content_key(file_hash: str, extension: str, folder: str = "resumes") -> str:
+    """Content-addressed key: <folder>/<h[:2]>/<sha256><ext>"""
+    return f"{folder}/{file_hash[:2]}/{file_hash}{extension}"
+
+
+_storage: Optional[BlobStorage] = None
+
+
+def get_storage(backend: str = STORAGE_BACKEND) -> BlobStorage:
+    """Process-wide storage selected by STORAGE_BACKEND (local or s3)"""
+    global _storage
+    if _storage is None:
+        backend = backend.strip().lower()
+        if backend == "local":
+            _storage = LocalStorage()
+        elif backend in ("s3", "minio"):
+            _storage = S3Storage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+    return _storage
@@ -0,0 +1,274 @@
+"""
+DB-backed background task queue.
+
+Slow work (resume text extraction, LLM parsing, screening) is recorded as a
+row in background_tasks and picked up by workers, so request handlers only pay
+for one INSERT. Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED, so
+any number of worker processes (and API processes running the embedded
+worker) can share the table safely.
+
+Failed tasks are retried with exponential backoff until max_attempts, then
+marked failed with the last error kept on the row. Tasks left "running" by a
+crashed worker are reclaimed after TASK_LOCK_TIMEOUT seconds.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.backend import database, models
+
+load_dotenv()
+
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_BACKOFF_BASE = float(os.getenv("TASK_BACKOFF_BASE", "5"))
+TASK_BACKOFF_MAX = float(os.getenv("TASK_BACKOFF_MAX", "600"))
+TASK_LOCK_TIMEOUT = int(os.getenv("TASK_LOCK_TIMEOUT", "900"))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "1"))
+TASK_CONCURRENCY = int(os.getenv("TASK_CONCURRENCY", "4"))
+
+
+class TaskError(Exception):
+    """Raised by a handler to fail the current attempt (it will be retried)"""
+
+
+TaskHandler = Callable[[Dict], Awaitable[Optional[Dict]]]
+TASK_HANDLERS: Dict[str, TaskHandler] = {}
+
+
+def task_handler(kind: str):
+    """Register an async handler for a task kind"""
+
+    def decorator(func: TaskHandler) -> TaskHandler:
+        TASK_HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+def _new_task(kind: str, payload: Dict, max_attempts: int, delay_seconds: float) -> models.BackgroundTask:
+    return models.BackgroundTask(
+        kind=kind,
+        payload=payload,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Dict,
+    max_attempts: int = TASK_MAX_ATTEMPTS,
+    delay_seconds: float = 0,
+) -> models.BackgroundTask:
+    """Add a task to the caller's transaction; it runs once the caller commits"""
+    task = _new_task(kind, payload, max_attempts, delay_seconds)
+    db.add(task)
+    db.flush()
+    return task
+
+
+async def enqueue_async(
+    db: AsyncSession,
+    kind: str,
+    payload: Dict,
+    max_attempts: int = TASK_MAX_ATTEMPTS,
+    delay_seconds: float = 0,
+) -> models.BackgroundTask:
+    """enqueue() for an AsyncSession"""
+    task = _new_task(kind, payload, max_attempts, delay_seconds)
+    db.add(task)
+    await db.flush()
+    return task
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with full jitter for the given attempt number"""
+    ceiling = min(TASK_BACKOFF_MAX, TASK_BACKOFF_BASE * (2 ** max(attempts - 1, 0)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def _fail_exhausted_stale(db: Session, stale_before: datetime) -> None:
+    """Fail tasks whose worker died on their last allowed attempt
+
+    A task that kills its worker (e.g. out of memory on a huge PDF) never
+    reaches _fail, so without this it would be reclaimed forever.
+    """
+    failed = (
+        db.query(models.BackgroundTask)
+        .filter(
+            models.BackgroundTask.status == "running",
+            models.BackgroundTask.locked_at < stale_before,
+            models.BackgroundTask.attempts >= models.BackgroundTask.max_attempts,
+        )
+        .update(
+            {
+                "status": "failed",
+                "last_error": "Worker stopped responding on the last attempt",
+                "locked_by": None,
+                "locked_at": None,
+            },
+            synchronize_session=False,
+        )
+    )
+    if failed:
+        print(f"Marked {failed} abandoned task(s) failed after their last attempt")
+
+
+def claim_next(worker_id: str) -> Optional[Dict]:
+    """Lock the next runnable task for this worker; returns its id, kind and payload"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=TASK_LOCK_TIMEOUT)
+    with database.SessionLocal() as db:
+        _fail_exhausted_stale(db, stale_before)
+        db.commit()
+        task = (
+            db.query(models.BackgroundTask)
+            .filter(
+                or_(
+                    and_(
+                        models.BackgroundTask.status == "queued",
+                        models.BackgroundTask.run_after <= now,
+                    ),
+                    and_(
+                        models.BackgroundTask.status == "running",
+                        models.BackgroundTask.locked_at < stale_before,
+                        models.BackgroundTask.attempts < models.BackgroundTask.max_attempts,
+                    ),
+                )
+            )
+            .order_by(models.BackgroundTask.run_after, models.BackgroundTask.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if task is None:
+            return None
+        # Conditional update as well, so claiming stays exclusive on databases
+        # without row locks (e.g. SQLite) where FOR UPDATE is a no-op
+        claimed = (
+            db.query(models.BackgroundTask)
+            .filter(
+                models.BackgroundTask.id == task.id,
+                models.BackgroundTask.status == task.status,
+                models.BackgroundTask.attempts == task.attempts,
+            )
+            .update(
+                {
+                    "status": "running",
+                    "attempts": task.attempts + 1,
+                    "locked_by": worker_id,
+                    "locked_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        # Read before commit, which expires task and would reload the new count
+        claimed_task = {
+            "id": task.id,
+            "kind": task.kind,
+            "payload": task.payload,
+            "attempts": task.attempts + 1,
+            "max_attempts": task.max_attempts,
+        }
+        db.commit()
+        if claimed != 1:
+            return None
+        return claimed_task
+
+
+def _finish(task_id: int, worker_id: str, result: Optional[Dict]) -> None:
+    with database.SessionLocal() as db:
+        task = db.get(models.BackgroundTask, task_id)
+        if task is None or task.locked_by != worker_id:
+            return
+        task.status = "succeeded"
+        task.result = result
+        task.last_error = None
+        task.locked_by = None
+        task.locked_at = None
+        db.commit()
+
+
+def _fail(task_id: int, worker_id: str, error: str) -> None:
+    with database.SessionLocal() as db:
+        task = db.get(models.BackgroundTask, task_id)
+        if task is None or task.locked_by != worker_id:
+            return
+        task.last_error = error
+        task.locked_by = None
+        task.locked_at = None
+        if task.attempts >= task.max_attempts:
+            task.status = "failed"
+        else:
+            task.status = "queued"
+            task.run_after = datetime.utcnow() + timedelta(
+                seconds=backoff_seconds(task.attempts)
+            )
+        db.commit()
+
+
+async def run_claimed(task: Dict, worker_id: str) -> None:
+    """Run one claimed task and record success, retry or failure"""
+    handler = TASK_HANDLERS.get(task["kind"])
+    if handler is None:
+        await asyncio.to_thread(
+            _fail, task["id"], worker_id, f"No handler registered for task kind {task['kind']}"
+        )
+        return
+    try:
+        result = await handler(task["payload"])
+    except Exception as e:
+        print(f"Task {task['id']} ({task['kind']}) attempt {task['attempts']} failed: {e}")
+        await asyncio.to_thread(_fail, task["id"], worker_id, str(e))
+        return
+    await asyncio.to_thread(_finish, task["id"], worker_id, result)
+
+
+async def worker_loop(
+    worker_id: Optional[str] = None,
+    stop_event: Optional[asyncio.Event] = None,
+    poll_interval: float = TASK_POLL_INTERVAL,
+) -> None:
+    """Claim and run tasks until stop_event is set"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    stop_event = stop_event or asyncio.Event()
+    while not stop_event.is_set():
+        try:
+            task = await asyncio.to_thread(claim_next, worker_id)
+        except Exception as e:
+            print(f"Task worker {worker_id} could not claim a task: {e}")
+            task = None
+        if task is None:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await run_claimed(task, worker_id)
+
+
+async def run_workers(concurrency: int = TASK_CONCURRENCY, stop_event: Optional[asyncio.Event] = None) -> None:
+    """Run several worker loops concurrently in this process"""
+    # Register the built-in handlers before polling
+    from app.backend.service import tasks  # noqa: F401
+
+    stop_event = stop_event or asyncio.Event()
+    await asyncio.gather(
+        *(worker_loop(stop_event=stop_event) for _ in range(max(1, concurrency)))
+    )
+
+
+def get_task(db: Session, task_id: int) -> Optional[models.BackgroundTask]:
+    return db.query(models.BackgroundTask).filter(models.BackgroundTask.id == task_id).first()
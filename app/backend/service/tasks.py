@@ -0,0 +1,63 @@
+"""
+Background task handlers for the application pipeline.
+
+/apply enqueues parse_resume; a successful parse enqueues screen_application.
+Handlers raise TaskError to have the attempt retried with backoff.
+"""
+
+import asyncio
+from typing import Dict
+
+from app.backend import database, models
+from app.backend.service import resume_ingest
+from app.backend.service.task_queue import TaskError, enqueue, task_handler
+
+
+def _enqueue_screening(application_id: int) -> int:
+    with database.SessionLocal() as db:
+        task = enqueue(db, "screen_application", {"application_id": application_id})
+        db.commit()
+        return task.id
+
+
+def _load_screening_inputs(application_id: int):
+    with database.SessionLocal() as db:
+        application = db.get(models.JobApplication, application_id)
+        if application is None:
+            return None
+        return (
+            resume_ingest.stored_resume(application),
+            resume_ingest.job_to_jd_dict(application.job),
+        )
+
+
+@task_handler("parse_resume")
+async def parse_resume(payload: Dict) -> Dict:
+    application_id = payload["application_id"]
+    resume = await resume_ingest.parse_application_resume(application_id)
+    if "error" in resume:
+        raise TaskError(resume["error"])
+
+    result = {"application_id": application_id}
+    if payload.get("screen", True):
+        result["screen_task_id"] = await asyncio.to_thread(_enqueue_screening, application_id)
+    return result
+
+
+@task_handler("screen_application")
+async def screen_application(payload: Dict) -> Dict:
+    # Imported lazily: the screener pulls in the prompt libraries
+    from app.backend.service.screener import screen_candidate_with_ai
+
+    application_id = payload["application_id"]
+    inputs = await asyncio.to_thread(_load_screening_inputs, application_id)
+    if inputs is None:
+        raise TaskError(f"Job application {application_id} not found")
+    resume, jd = inputs
+    if resume is None:
+        raise TaskError(f"Resume for application {application_id} has not been parsed")
+
+    screening = await screen_candidate_with_ai(jd, resume)
+    if "error" in screening:
+        raise TaskError(screening["error"])
+    return screening
@@ -223,7 +223,7 @@ def display_setup_complete():
     print("      http://localhost:8000/health")
     
     print("\n🔧 Useful commands:")
-    print("   • Test API: python -c \"from anthropic_integration import check_anthropic_status; print(check_anthropic_status())\"")
+    print("   • Test API: python -c \"from anthropic_integration import check_anthropic_status; import asyncio; print(asyncio.run(check_anthropic_status()))\"")
     print("   • Check models: python -c \"from anthropic_integration import get_recommended_models; print(get_recommended_models())\"")
     
     print("\n�� Recommended models for interviews:")
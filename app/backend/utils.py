@@ -1,41 +1,74 @@
+import hashlib
 import os
-import shutil
-from datetime import datetime
+import uuid
 
+import aiofiles
+import aiofiles.os
 from fastapi import HTTPException, UploadFile, status
 from passlib.context import CryptContext
 
 from app.backend import config, database
+from app.backend.service import storage
 
 
-def save_upload_file(upload_file: UploadFile, email: str) -> str:
-    # Create upload directory if it doesn't exist
-    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+async def save_upload_file(upload_file: UploadFile) -> str:
+    """Stream an upload to content-addressed blob storage and return its key
 
+    The file is written in chunks to a local temp file while its SHA-256 is
+    computed, then handed to the storage backend under
+    resumes/<h[:2]>/<sha256><ext> (atomic rename locally, upload for S3).
+    Identical uploads map to the same key and are stored once. Uploads over
+    MAX_UPLOAD_BYTES are rejected with 413 before anything is kept.
+    """
     # Get file extension and check if it's allowed
-    file_ext = os.path.splitext(upload_file.filename)[1].lower()
+    file_ext = os.path.splitext(upload_file.filename or "")[1].lower()
     if file_ext not in config.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File type not allowed. Please upload PDF or DOC files",
         )
 
-    # Create unique filename using timestamp and email
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{email}_{timestamp}{file_ext}"
-    file_path = os.path.join(config.UPLOAD_DIR, filename)
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size is {config.MAX_UPLOAD_BYTES} bytes",
+    )
+    if upload_file.size is not None and upload_file.size > config.MAX_UPLOAD_BYTES:
+        raise too_large
 
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
+    # Create upload directory if it doesn't exist
+    await aiofiles.os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(config.UPLOAD_DIR, f".upload-{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while chunk := await upload_file.read(config.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > config.MAX_UPLOAD_BYTES:
+                    raise too_large
+                digest.update(chunk)
+                await buffer.write(chunk)
 
-    return file_path
+        key = storage.content_key(digest.hexdigest(), file_ext)
+        # Consumes tmp_path; same content already stored keeps the existing blob
+        await storage.get_storage().put_file(tmp_path, key)
+    except BaseException:
+        if await aiofiles.os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+        raise
+
+    return key
 
 
 def create_tables():
+    # Register every table on Base.metadata before creating
+    from app.backend import models  # noqa: F401
+
     print("Creating database tables...")
     try:
         database.Base.metadata.create_all(bind=database.engine)
         print("Tables created successfully!")
+        return True
     except Exception as e:
         print(f"Error creating tables: {e}")
+        return False
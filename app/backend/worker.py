@@ -0,0 +1,53 @@
+"""
+Background task worker.
+
+Usage:
+    python -m app.backend.worker --processes 2 --concurrency 4
+
+Each process runs --concurrency task loops; tasks are mostly waiting on the
+LLM, so a few loops per process keep a core busy.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+
+from app.backend.service.task_queue import TASK_CONCURRENCY, run_workers
+
+
+def _run_process(concurrency: int) -> None:
+    try:
+        asyncio.run(run_workers(concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background task workers")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes")
+    parser.add_argument(
+        "--concurrency", type=int, default=TASK_CONCURRENCY, help="task loops per process"
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_run_process, args=(args.concurrency,), daemon=False)
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Started {len(processes)} worker processes x {args.concurrency} loops")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root (containing the 'app' package) is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from app.backend import security  # noqa: E402
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, stalls: list) -> None:
+    """Measure how late a 10 ms timer fires: the event loop stall other requests see"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+
+async def _run(logins: int, concurrency: int, hashed: str, offload: bool) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            if offload:
+                valid, _ = await security.verify_and_update_password("password", hashed)
+            else:
+                # What /login did before: bcrypt directly on the event loop
+                valid = security.pwd_context.verify("password", hashed)
+            assert valid
+
+    stop = asyncio.Event()
+    stalls: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, 0.01, stalls))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+    stalls.sort()
+    return {
+        "logins_per_second": logins / elapsed,
+        "max_loop_stall_ms": stalls[-1] * 1000 if stalls else elapsed * 1000,
+        "p95_loop_stall_ms": stalls[int(len(stalls) * 0.95)] * 1000 if stalls else elapsed * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login (bcrypt verify) throughput benchmark")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    hashed = security.pwd_context.hash("password")
+    print(
+        f"bcrypt rounds={security.BCRYPT_ROUNDS}, hashing workers={security.PASSWORD_HASH_WORKERS}, "
+        f"{args.logins} logins at concurrency {args.concurrency}"
+    )
+    for label, offload in (("on event loop", False), ("hashing pool", True)):
+        result = asyncio.run(_run(args.logins, args.concurrency, hashed, offload))
+        print(
+            f"  {label:14} {result['logins_per_second']:7.1f} logins/s   "
+            f"loop stall p95 {result['p95_loop_stall_ms']:7.1f} ms, max {result['max_loop_stall_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
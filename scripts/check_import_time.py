@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Ensure project root (containing the 'app' package) is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+
+# Fail when a cold import of the API module takes longer than this (seconds)
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "1.0"))
+MODULE = sys.argv[1] if len(sys.argv) > 1 else "app.backend.main"
+
+# Measure in a fresh interpreter so nothing is already imported; -X importtime
+# reports per-module cumulative microseconds on stderr
+result = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+    cwd=project_root,
+    env={**os.environ, "PYTHONPATH": str(project_root)},
+    capture_output=True,
+    text=True,
+)
+if result.returncode != 0:
+    print(f"FAIL: importing {MODULE} raised:")
+    print(result.stderr[-4000:])
+    sys.exit(1)
+
+timings = []
+for line in result.stderr.splitlines():
+    if not line.startswith("import time:") or "|" not in line:
+        continue
+    try:
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting depth is encoded as two spaces per level after "| "
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append((int(cumulative), depth, name.strip()))
+    except ValueError:
+        continue  # header line
+
+total = next((us for us, depth, name in timings if name == MODULE), 0) / 1e6
+print(f"{MODULE} imported in {total:.3f}s (budget {IMPORT_BUDGET_SECONDS:.3f}s)")
+print("Slowest top-level imports:")
+top_level = [(us, name) for us, depth, name in timings if depth == 1]
+for us, name in sorted(top_level, reverse=True)[:10]:
+    print(f"  {us / 1e6:7.3f}s {name}")
+
+if total > IMPORT_BUDGET_SECONDS:
+    print("FAIL: import time over budget")
+    sys.exit(1)
+print("OK: import time within budget")